@@ -0,0 +1,60 @@
+"""Import-time budget for the headless core.
+
+Runs a fresh interpreter per sample and fails (exit 1) if importing the
+hydraulics and ASME entry points exceeds BUDGET_MS, or if it drags in any of
+the UI / heavy modules in FORBIDDEN.
+
+    python benchmarks/import_time.py [--budget-ms 100] [--runs 7]
+
+tests/test_import_time.py runs the same check under pytest.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BUDGET_MS = 100.0
+FORBIDDEN = ["streamlit", "plotly", "pandas", "numpy", "CoolProp", "sqlite3"]
+
+PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+from hydraulicsuite import calculate_hydraulics, get_ID, required_wall_thickness, check_wall_thickness
+t1 = time.perf_counter()
+print(json.dumps({"ms": (t1 - t0) * 1000, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (FORBIDDEN,)
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(runs):
+    samples, loaded = [], set()
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE], cwd=REPO, capture_output=True, text=True, check=True)
+        r = json.loads(out.stdout)
+        samples.append(r["ms"])
+        loaded.update(r["loaded"])
+    return samples, sorted(loaded)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    ap.add_argument("--runs", type=int, default=7)
+    args = ap.parse_args(argv)
+
+    samples, loaded = measure(args.runs)
+    median = statistics.median(samples)
+    print(f"hydraulicsuite import: median {median:.1f} ms, max {max(samples):.1f} ms (budget {args.budget_ms:.0f} ms)")
+    ok = median < args.budget_ms and not loaded
+    if loaded:
+        print(f"FAIL: heavy modules imported: {', '.join(loaded)}")
+    elif not ok:
+        print("FAIL: import budget exceeded")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
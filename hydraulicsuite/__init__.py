@@ -0,0 +1,71 @@
+"""HydraulicSuite calculation core, usable without Streamlit.
+
+Submodules are imported on first attribute access, so
+``from hydraulicsuite import calculate_hydraulics`` only loads the standard
+library; NumPy, pandas and CoolProp come in with the batch engine or the
+first property lookup.
+"""
+import importlib
+
+_EXPORTS = {
+    "material_list_roughness": "data",
+    "fitting_led_database": "data",
+    "asme_material_data": "data",
+    "pipe_database": "data",
+    "fluid_list": "data",
+    "PropertyError": "fluids",
+    "get_backend": "fluids",
+    "fluid_state": "fluids",
+    "two_phase_gradient": "twophase",
+    "march_line": "marching",
+    "NPS_SIZES": "catalogue",
+    "SCHEDULES": "catalogue",
+    "PIPE_INDEX": "catalogue",
+    "lookup": "catalogue",
+    "default_schedule": "catalogue",
+    "catalogue_array": "catalogue",
+    "catalogue_index": "catalogue",
+    "get_ID": "hydraulics",
+    "calculate_hydraulics": "hydraulics",
+    "friction_factor": "hydraulics",
+    "BATCH_INPUT_COLUMNS": "batch",
+    "BATCH_OUTPUT_COLUMNS": "batch",
+    "calculate_hydraulics_batch": "batch",
+    "friction_factor_array": "batch",
+    "water_props": "properties",
+    "water_props_array": "properties",
+    "required_wall_thickness": "asme",
+    "check_wall_thickness": "asme",
+    "make_sweep_spec": "sweep",
+    "run_sweep": "sweep",
+    "load_sweep": "sweep",
+    "make_uncertainty_spec": "uncertainty",
+    "run_uncertainty": "uncertainty",
+    "solve_network": "network",
+    "size_line": "sizing",
+    "max_flow": "sizing",
+    "required_pump_head": "sizing",
+    "PumpCurve": "pumps",
+    "load_pump_curves": "pumps",
+    "system_curve": "pumps",
+    "operating_point": "pumps",
+    "speed_for_flow": "pumps",
+    "select_pumps": "pumps",
+    "wave_speed": "transient",
+    "simulate_transient": "transient",
+    "elastic_modulus_data": "data",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,24 @@
+"""ASME B31.3 straight-pipe wall thickness check (Eq. 3a, t = PD / 2(SE + PY))."""
+from .data import asme_material_data, pipe_database
+
+CORROSION_ALLOWANCE_MM = 1.0
+
+
+def required_wall_thickness(design_pres_bar, OD_mm, S_MPa, E=1.0, Y=0.4, corrosion_mm=CORROSION_ALLOWANCE_MM):
+    """Minimum required thickness t_req + corrosion allowance [mm]."""
+    P_MPa = design_pres_bar / 10.0
+    t_req = (P_MPa * OD_mm) / (2 * (S_MPa * E + P_MPa * Y))
+    return t_req + corrosion_mm
+
+
+def check_wall_thickness(material, nps, sch, design_pres_bar):
+    """Compare the schedule wall against B31.3; None for unknown pipe/material."""
+    S_MPa = asme_material_data.get(material, 0)
+    if S_MPa <= 0 or nps not in pipe_database or sch not in pipe_database[nps]:
+        return None
+    OD_mm = pipe_database[nps][sch]["OD"]
+    WT_actual = pipe_database[nps][sch]["WT"]
+
+    t_min = required_wall_thickness(design_pres_bar, OD_mm, S_MPa)
+    safety_factor = WT_actual / t_min
+    return {"req": t_min, "act": WT_actual, "safe": safety_factor >= 1.0, "sf": safety_factor, "mat": material}
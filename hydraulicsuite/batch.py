@@ -0,0 +1,112 @@
+"""Vectorized (NumPy) version of calculate_hydraulics for sweeps."""
+import numpy as np
+import pandas as pd
+
+from .catalogue import catalogue_array, catalogue_index
+from .data import material_list_roughness
+from .fluids import get_backend
+from .instrument import timed
+
+# --- TOPLU (VEKTÖREL) HESAPLAMA ---
+BATCH_INPUT_COLUMNS = ["temp_c", "flow_th", "press_bar", "length_m", "fitting_len_m",
+                       "elevation_m", "pump_eff", "material", "nps", "sch"]
+BATCH_OUTPUT_COLUMNS = ["dp_total", "dp_friction", "dp_static", "head_m", "vel", "re", "f",
+                        "rho", "mu", "id_mm", "power_hyd", "power_shaft", "total_len"]
+
+def friction_factor_array(Re, roughness_mm, ID_m):
+    """Vectorized hydraulics.friction_factor (Haaland / laminar / 0)."""
+    Re, roughness_mm, ID_m = np.broadcast_arrays(np.asarray(Re, dtype=float),
+                                                 np.asarray(roughness_mm, dtype=float),
+                                                 np.asarray(ID_m, dtype=float))
+    f = np.zeros(Re.shape)
+    turb = Re >= 2300
+    lam = (Re > 0) & ~turb
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f[turb] = (-1.8 * np.log10((roughness_mm[turb]/1000/ID_m[turb]/3.7)**1.11 + 6.9/Re[turb]))**-2
+    f[lam] = 64 / Re[lam]
+    return f
+
+@timed("calc")
+def calculate_hydraulics_batch(cases=None, fluid="Water", **columns):
+    """Vectorized calculate_hydraulics over many cases (single-phase ``fluid``).
+
+    Inputs are a DataFrame (or dict) with BATCH_INPUT_COLUMNS, and/or keyword
+    arrays/scalars that are broadcast together. An optional ``roughness_mm``
+    column overrides the roughness looked up from ``material`` (e.g. sampled
+    ageing in uncertainty.py). Returns a DataFrame with the same keys as the
+    scalar result plus a boolean ``valid`` column; rows the scalar path would
+    return None for, or raise PropertyError on, are NaN with ``valid == False``.
+    """
+    data = {}
+    if cases is not None:
+        data.update({k: cases[k] for k in BATCH_INPUT_COLUMNS + ["roughness_mm"] if k in cases})
+    data.update(columns)
+    missing = [k for k in BATCH_INPUT_COLUMNS if k not in data]
+    if missing:
+        raise ValueError(f"Missing batch inputs: {missing}")
+
+    keys = BATCH_INPUT_COLUMNS + (["roughness_mm"] if "roughness_mm" in data else [])
+    arrays = np.broadcast_arrays(*[np.asarray(data[k]) for k in keys])
+    v = {k: np.ravel(a) for k, a in zip(keys, arrays)}
+    n = len(v["temp_c"])
+
+    # Boru geometrisi ve pürüzlülük: her benzersiz anahtar için bir kez çözülür
+    row = catalogue_index(v["nps"], v["sch"])
+    ID_mm = np.where(row >= 0, catalogue_array().id_mm[row], np.nan)
+    if "roughness_mm" in v:
+        roughness = v["roughness_mm"].astype(float)
+    else:
+        roughness = pd.Series(v["material"], dtype=object).map(material_list_roughness).fillna(0.045).to_numpy(dtype=float)
+
+    temp_c = v["temp_c"].astype(float)
+    flow_th = v["flow_th"].astype(float)
+    press_bar = v["press_bar"].astype(float)
+    pump_eff = v["pump_eff"].astype(float)
+
+    valid = np.isfinite(ID_mm) & (ID_mm > 0)
+    rho = np.full(n, np.nan)
+    mu = np.full(n, np.nan)
+    if valid.any():
+        rho[valid], mu[valid] = get_backend(fluid).props_array(temp_c[valid] + 273.15, press_bar[valid] * 100000)
+    valid &= np.isfinite(rho) & np.isfinite(mu)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        ID_m = ID_mm / 1000.0
+        m_kg_s = flow_th * 1000 / 3600
+        Area = np.pi * (ID_m / 2)**2
+        velocity = m_kg_s / (rho * Area)
+        Re = (rho * velocity * ID_m) / mu
+
+        f = friction_factor_array(Re, roughness, ID_m)
+
+        total_effective_length = v["length_m"].astype(float) + v["fitting_len_m"].astype(float)
+        dP_friction_Pa = f * (total_effective_length / ID_m) * (rho * velocity**2 / 2)
+
+        g = 9.81
+        dP_static_Pa = rho * g * v["elevation_m"].astype(float)
+        dP_total_Pa = dP_friction_Pa + dP_static_Pa
+
+        head_m = dP_total_Pa / (rho * g)
+        flow_m3_h = flow_th / (rho / 1000)
+        power_hydraulic_kW = (flow_m3_h * head_m * rho * g) / (3.6 * 1e6)
+        eff_factor = np.where(pump_eff > 0, pump_eff / 100.0, 0.01)
+        power_shaft_kW = power_hydraulic_kW / eff_factor
+
+    out = pd.DataFrame({
+        "dp_total": dP_total_Pa / 100000,
+        "dp_friction": dP_friction_Pa / 100000,
+        "dp_static": dP_static_Pa / 100000,
+        "head_m": head_m,
+        "vel": velocity,
+        "re": Re, "f": f,
+        "rho": rho, "mu": mu, "id_mm": ID_mm,
+        "power_hyd": power_hydraulic_kW,
+        "power_shaft": power_shaft_kW,
+        "total_len": total_effective_length,
+    })
+    valid &= np.isfinite(out.to_numpy()).all(axis=1)
+    out.loc[~valid, BATCH_OUTPUT_COLUMNS] = np.nan
+    out["valid"] = valid
+    if isinstance(cases, pd.DataFrame):
+        out.index = cases.index
+    return out
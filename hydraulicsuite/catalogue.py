@@ -0,0 +1,90 @@
+"""ASME B36.10M / B36.19M pipe catalogue, NPS 1/8 to 48 inch.
+
+The dimensions live in pipe_catalogue.csv (one row per NPS/schedule, B36.10
+numbered schedules plus STD/XS/XXS and the B36.19 stainless 5S/10S/40S/80S).
+The file is parsed once at import with the standard library, and every
+derived column (ID, flow area, metal area, mass per metre) is computed here,
+so the hot paths never recompute ``OD - 2*WT``.
+
+* PIPE_INDEX[(nps, sch)] -> row number, for O(1) scalar lookups
+* pipe_database: the classic {nps: {sch: {"OD", "WT", ...}}} view, in size
+  and wall-thickness order
+* NPS_SIZES / SCHEDULES: ready-made dropdown lists
+* catalogue_array() / catalogue_index(): NumPy record array and vectorized
+  (nps, sch) -> row selection for the batch engines (NumPy loaded on demand)
+"""
+import csv
+import math
+import os
+from functools import lru_cache
+
+CATALOGUE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pipe_catalogue.csv")
+STEEL_DENSITY = 7850.0  # kg/m3
+
+
+def _load(path=CATALOGUE_FILE):
+    rows = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            OD, WT = float(r["od_mm"]), float(r["wt_mm"])
+            ID = OD - 2 * WT
+            ID_m = ID / 1000.0
+            metal_area_mm2 = math.pi / 4 * (OD ** 2 - ID ** 2)
+            rows.append({
+                "nps": r["nps"], "dn": int(r["dn"]), "sch": r["sch"],
+                "OD": OD, "WT": WT, "ID": ID,
+                "flow_area_m2": math.pi * (ID_m / 2)**2,
+                "metal_area_mm2": metal_area_mm2,
+                "mass_kg_m": metal_area_mm2 * 1e-6 * STEEL_DENSITY,
+            })
+    return rows
+
+
+CATALOGUE = _load()
+PIPE_INDEX = {(r["nps"], r["sch"]): i for i, r in enumerate(CATALOGUE)}
+
+pipe_database = {}
+for _r in CATALOGUE:
+    pipe_database.setdefault(_r["nps"], {})[_r["sch"]] = _r
+del _r
+
+NPS_SIZES = list(pipe_database)
+SCHEDULES = {nps: list(s) for nps, s in pipe_database.items()}
+
+
+def lookup(nps, sch):
+    """Catalogue row for (nps, sch), or None."""
+    i = PIPE_INDEX.get((nps, sch))
+    return None if i is None else CATALOGUE[i]
+
+
+def default_schedule(nps, preferred=("40", "STD")):
+    """First of ``preferred`` available for this size, else the thinnest wall."""
+    return next((s for s in preferred if s in pipe_database[nps]), SCHEDULES[nps][0])
+
+
+CATALOGUE_DTYPE = [("nps", "U12"), ("dn", "i4"), ("sch", "U4"), ("od_mm", "f8"), ("wt_mm", "f8"),
+                   ("id_mm", "f8"), ("flow_area_m2", "f8"), ("metal_area_mm2", "f8"), ("mass_kg_m", "f8")]
+
+
+@lru_cache(maxsize=None)
+def catalogue_array():
+    """The catalogue as a NumPy record array (row order = PIPE_INDEX)."""
+    import numpy as np
+    return np.rec.fromrecords(
+        [(r["nps"], r["dn"], r["sch"], r["OD"], r["WT"], r["ID"], r["flow_area_m2"],
+          r["metal_area_mm2"], r["mass_kg_m"]) for r in CATALOGUE],
+        dtype=CATALOGUE_DTYPE)
+
+
+def catalogue_index(nps, sch):
+    """Vectorized PIPE_INDEX: row numbers for arrays of (nps, sch), -1 where unknown.
+
+    Each distinct pair is resolved once, so the cost is one np.unique over the input.
+    """
+    import numpy as np
+    nps, sch = np.broadcast_arrays(np.asarray(nps, dtype=object), np.asarray(sch, dtype=object))
+    keys = np.char.add(np.char.add(nps.astype(str), "|"), sch.astype(str))
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    rows = np.array([PIPE_INDEX.get(tuple(k.split("|", 1)), -1) for k in uniq], dtype=int)
+    return rows[inverse.reshape(keys.shape)]
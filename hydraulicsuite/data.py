@@ -0,0 +1,97 @@
+"""Material, fitting and pipe tables shared by the calculators and the UI."""
+
+# --- SABİTLER & VERİLER ---
+
+material_list_roughness = {
+    "Carbon Steel (New)": 0.045,
+    "Carbon Steel (Corroded)": 0.5,
+    "Stainless Steel": 0.0015,
+    "Copper": 0.0015,
+    "PVC / Plastic": 0.0015,
+    "Concrete": 0.01,
+    "Galvanized Steel": 0.15
+}
+
+# Akışkanlar: görünen ad -> CoolProp adı (fluids.get_backend)
+fluid_list = {
+    "Water": "Water",
+    "Ethylene Glycol 30% (MEG)": "INCOMP::MEG-30%",
+    "Propylene Glycol 30% (MPG)": "INCOMP::MPG-30%",
+    "Seawater (3.5%)": "INCOMP::MITSW-3.5%",
+    "Ammonia": "Ammonia",
+    "Nitrogen": "Nitrogen",
+    "Air": "Air",
+    "Methane": "Methane",
+    "R134a": "R134a"
+}
+
+# Fitting Eşdeğer Uzunluk Katsayıları (Le/D)
+fitting_led_database = {
+    "Elbow 90° (Standard Radius)": 30,
+    "Elbow 90° (Long Radius)": 20,
+    "Elbow 45°": 16,
+    "Tee (Flow through Run)": 20,
+    "Tee (Flow through Branch)": 60,
+    "Gate Valve (Fully Open)": 8,
+    "Globe Valve (Fully Open)": 340,
+    "Swing Check Valve": 100,
+    "Butterfly Valve": 45,
+    "Ball Valve (Reduced Bore)": 3
+}
+
+asme_material_data = {
+    "--- CARBON STEEL ---": 0,
+    "A106 Grade A": 110.0,
+    "A106 Grade B": 138.0,
+    "A106 Grade C": 161.0,
+    "A53 Grade A": 110.0,
+    "A53 Grade B": 138.0,
+    "API 5L Grade B": 138.0,
+    "API 5L X42 (L290)": 138.0,
+    "API 5L X52 (L360)": 153.0,
+    "API 5L X60 (L415)": 173.0,
+    "API 5L X65 (L450)": 178.0,
+    "A333 Grade 6 (Low Temp)": 138.0,
+    "--- STAINLESS STEEL ---": 0,
+    "SS 304 (A312 TP304)": 138.0,
+    "SS 304L (A312 TP304L)": 115.0,
+    "SS 316 (A312 TP316)": 138.0,
+    "SS 316L (A312 TP316L)": 115.0,
+    "SS 321 (A312 TP321)": 138.0,
+    "SS 347 (A312 TP347)": 138.0,
+    "--- ALLOY STEEL ---": 0,
+    "A335 P11 (1-1/4 Cr)": 126.0,
+    "A335 P22 (2-1/4 Cr)": 126.0,
+    "A335 P5 (5 Cr)": 126.0,
+    "A335 P9 (9 Cr)": 138.0,
+    "A335 P91 (9 Cr-V)": 195.0
+}
+
+# Elastisite modülü E (GPa, 21 °C, ASME B31.3 Tablo C-6) - basınç dalgası hızı için
+elastic_modulus_data = {
+    "A106 Grade A": 202.0,
+    "A106 Grade B": 202.0,
+    "A106 Grade C": 202.0,
+    "A53 Grade A": 202.0,
+    "A53 Grade B": 202.0,
+    "API 5L Grade B": 202.0,
+    "API 5L X42 (L290)": 202.0,
+    "API 5L X52 (L360)": 202.0,
+    "API 5L X60 (L415)": 202.0,
+    "API 5L X65 (L450)": 202.0,
+    "A333 Grade 6 (Low Temp)": 202.0,
+    "SS 304 (A312 TP304)": 195.0,
+    "SS 304L (A312 TP304L)": 195.0,
+    "SS 316 (A312 TP316)": 195.0,
+    "SS 316L (A312 TP316L)": 195.0,
+    "SS 321 (A312 TP321)": 195.0,
+    "SS 347 (A312 TP347)": 195.0,
+    "A335 P11 (1-1/4 Cr)": 204.0,
+    "A335 P22 (2-1/4 Cr)": 204.0,
+    "A335 P5 (5 Cr)": 207.0,
+    "A335 P9 (9 Cr)": 207.0,
+    "A335 P91 (9 Cr-V)": 207.0
+}
+
+# Boru ölçüleri (ASME B36.10M / B36.19M) pipe_catalogue.csv dosyasından okunur
+from .catalogue import pipe_database  # noqa: E402
@@ -0,0 +1,271 @@
+"""Pluggable fluid property backends on CoolProp's low-level interface.
+
+A fluid is named as in CoolProp:
+
+* pure fluids: ``"Water"``, ``"Nitrogen"``, ``"R134a"``
+* HEOS mixtures with mole fractions: ``"Methane[0.9]&Ethane[0.1]"``
+* incompressible liquids/brines, mass fraction in percent:
+  ``"INCOMP::MEG-30%"``
+
+get_backend(fluid) returns one shared backend per fluid. It wraps a single
+``AbstractState`` that is created once and then only re-``update``d, which
+is about 8x cheaper per state than high-level ``PropsSI``. Updates are
+serialised with a lock because the state object is not thread-safe and
+Streamlit sessions share it. Water keeps the interpolated liquid grid from
+properties.py in front of CoolProp; its AbstractState (and CoolProp itself)
+is only created on the first state outside the grid.
+
+State failures raise PropertyError (a ValueError) with a readable reason
+instead of disappearing into a None result. In particular, a temperature at
+the saturation temperature for the given pressure, where T and P do not fix
+the state, is reported as such; two-phase lines are specified with a vapour
+quality instead (see saturation() and twophase.py).
+"""
+import re
+import threading
+from functools import lru_cache
+
+from .instrument import timed
+
+SATURATION_TOL_K = 0.01
+CACHE_SIZE = 4096
+
+
+class PropertyError(ValueError):
+    """A fluid state the backend cannot evaluate (out of range, at saturation, ...)."""
+
+
+def parse_fluid(fluid):
+    """CoolProp fluid string -> (backend, [names], [fractions] or None, fraction basis)."""
+    backend, _, spec = fluid.rpartition("::")
+    backend = backend or "HEOS"
+    m = re.fullmatch(r"(.+)-(\d+(?:\.\d+)?)%", spec) if backend == "INCOMP" else None
+    if m:
+        return backend, [m.group(1)], [float(m.group(2)) / 100], "mass"
+    names, fractions = [], []
+    for part in spec.split("&"):
+        m = re.fullmatch(r"\s*([^\[\]]+?)\s*(?:\[([0-9.eE+-]+)\])?\s*", part)
+        if not m:
+            raise PropertyError(f"Cannot parse fluid {fluid!r}")
+        names.append(m.group(1))
+        fractions.append(None if m.group(2) is None else float(m.group(2)))
+    if len(names) == 1 and fractions[0] is None:
+        return backend, names, None, "mole"
+    if any(x is None for x in fractions):
+        raise PropertyError(f"Mixture {fluid!r} needs a fraction for every component, e.g. Methane[0.9]&Ethane[0.1]")
+    return backend, names, fractions, "mole"
+
+
+class CoolPropBackend:
+    """Density/viscosity/saturation for one CoolProp fluid through a reused AbstractState."""
+
+    def __init__(self, fluid):
+        import CoolProp.CoolProp as CP
+
+        self.fluid = fluid
+        self._CP = CP
+        backend, names, fractions, basis = parse_fluid(fluid)
+        try:
+            self._state = CP.AbstractState(backend, "&".join(names))
+            if fractions is not None:
+                (self._state.set_mass_fractions if basis == "mass" else self._state.set_mole_fractions)(fractions)
+        except ValueError as e:
+            raise PropertyError(f"Unknown fluid {fluid!r}: {e}") from None
+        self.incompressible = backend == "INCOMP"
+        self._lock = threading.Lock()
+        self._phases = {int(getattr(CP, f"iphase_{p}")): p.replace("_", " ") for p in
+                        ("liquid", "gas", "twophase", "supercritical", "supercritical_gas",
+                         "supercritical_liquid", "critical_point")}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.fluid!r})"
+
+    def _phase(self):
+        if self.incompressible:
+            return "liquid"
+        return self._phases.get(int(self._state.phase()), "unknown")
+
+    def _check_saturation(self, T_K, P_Pa):
+        if self.incompressible:
+            return
+        try:
+            self._state.update(self._CP.PQ_INPUTS, P_Pa, 0)
+        except ValueError:
+            return  # kritik basınç üstü: doyma yok
+        T_sat = self._state.T()
+        if abs(T_K - T_sat) < SATURATION_TOL_K:
+            raise PropertyError(f"{self.fluid} at {T_K - 273.15:.2f} °C, {P_Pa / 1e5:.3f} bar is at saturation "
+                                f"(T_sat = {T_sat - 273.15:.2f} °C); specify a vapour quality for two-phase flow")
+
+    @timed("props")
+    def state(self, T_K, P_Pa):
+        """(density [kg/m3], viscosity [Pa.s], phase name) at T, P."""
+        with self._lock:
+            self._check_saturation(T_K, P_Pa)
+            try:
+                self._state.update(self._CP.PT_INPUTS, P_Pa, T_K)
+                return self._state.rhomass(), self._state.viscosity(), self._phase()
+            except ValueError as e:
+                raise PropertyError(f"{self.fluid} at {T_K - 273.15:.2f} °C, {P_Pa / 1e5:.3f} bar: {e}") from None
+
+    def props(self, T_K, P_Pa):
+        rho, mu, _ = self.state(T_K, P_Pa)
+        return rho, mu
+
+    def _t_sat_array(self, P_Pa):
+        """Saturation temperature per pressure (NaN above critical); lock held by the caller."""
+        import numpy as np
+
+        pressures, inverse = np.unique(P_Pa, return_inverse=True)
+        t_sat = np.full(len(pressures), np.nan)
+        for k, P in enumerate(pressures):
+            try:
+                self._state.update(self._CP.PQ_INPUTS, P, 0)
+                t_sat[k] = self._state.T()
+            except ValueError:
+                pass
+        return t_sat[inverse.reshape(-1)]
+
+    @timed("props")
+    def _unique_eval(self, T_K, P_Pa, outputs, n_out):
+        """Evaluate ``outputs(state)`` (an n_out-tuple) once per unique (T, P).
+
+        Failures, and states within SATURATION_TOL_K of saturation (which
+        state() rejects), are NaN.
+        """
+        import numpy as np
+
+        T_K, P_Pa = np.broadcast_arrays(np.asarray(T_K, dtype=float), np.asarray(P_Pa, dtype=float))
+        shape = T_K.shape
+        states, inverse = np.unique(np.column_stack([T_K.ravel(), P_Pa.ravel()]), axis=0, return_inverse=True)
+        out = np.full((n_out, len(states)), np.nan)
+        update, PT = self._state.update, self._CP.PT_INPUTS
+        with self._lock:
+            if self.incompressible:
+                at_sat = np.zeros(len(states), dtype=bool)
+            else:
+                with np.errstate(invalid="ignore"):
+                    at_sat = np.abs(states[:, 0] - self._t_sat_array(states[:, 1])) < SATURATION_TOL_K
+            for k, (T, P) in enumerate(states):
+                if at_sat[k] or not (np.isfinite(T) and np.isfinite(P)):
+                    continue
+                try:
+                    update(PT, P, T)
+                    out[:, k] = outputs(self._state)
+                except ValueError:
+                    pass
+        inverse = inverse.reshape(-1)
+        return [o[inverse].reshape(shape) for o in out]
+
+    def props_array(self, T_K, P_Pa):
+        """Vectorized props: one update per unique state; failed states are NaN."""
+        return tuple(self._unique_eval(T_K, P_Pa, lambda st: (st.rhomass(), st.viscosity()), 2))
+
+    def cp_array(self, T_K, P_Pa):
+        """Isobaric heat capacity [J/kg.K], one update per unique state; failed states are NaN."""
+        return self._unique_eval(T_K, P_Pa, lambda st: (st.cpmass(),), 1)[0]
+
+    @timed("props")
+    def speed_sound(self, T_K, P_Pa):
+        """Speed of sound [m/s] at T, P."""
+        with self._lock:
+            try:
+                self._state.update(self._CP.PT_INPUTS, P_Pa, T_K)
+                return self._state.speed_sound()
+            except ValueError as e:
+                raise PropertyError(f"{self.fluid} at {T_K - 273.15:.2f} °C, {P_Pa / 1e5:.3f} bar: {e}") from None
+
+    @timed("props")
+    def vapour_pressure(self, T_K):
+        """Saturation pressure [Pa] at T."""
+        if self.incompressible:
+            raise PropertyError(f"{self.fluid} is an incompressible liquid; it has no vapour pressure")
+        with self._lock:
+            try:
+                self._state.update(self._CP.QT_INPUTS, 0, T_K)
+                return self._state.p()
+            except ValueError as e:
+                raise PropertyError(f"{self.fluid}: no saturation state at {T_K - 273.15:.2f} °C ({e})") from None
+
+    @timed("props")
+    def saturation(self, P_Pa):
+        """Saturated liquid/vapour properties at P: dict T_sat, rho_l, rho_g, mu_l, mu_g."""
+        if self.incompressible:
+            raise PropertyError(f"{self.fluid} is an incompressible liquid; it has no two-phase region")
+        out = {}
+        with self._lock:
+            try:
+                for q, suffix in ((0, "l"), (1, "g")):
+                    self._state.update(self._CP.PQ_INPUTS, P_Pa, q)
+                    out[f"rho_{suffix}"] = self._state.rhomass()
+                    out[f"mu_{suffix}"] = self._state.viscosity()
+                out["T_sat"] = self._state.T()
+            except ValueError as e:
+                raise PropertyError(f"{self.fluid}: no saturation state at {P_Pa / 1e5:.3f} bar ({e})") from None
+        return out
+
+
+class WaterBackend:
+    """Water with the interpolated liquid grid in front of coolprop_backend("Water").
+
+    Grid misses go to the shared plain backend, so the AbstractState is
+    built on the first miss and never for in-grid lookups.
+    """
+
+    fluid = "Water"
+    incompressible = False
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+    def state(self, T_K, P_Pa):
+        from .properties import grid_props
+        hit = grid_props(T_K, P_Pa)
+        if hit is not None:
+            return hit[0], hit[1], "liquid"
+        return coolprop_backend(self.fluid).state(T_K, P_Pa)
+
+    def props(self, T_K, P_Pa):
+        rho, mu, _ = self.state(T_K, P_Pa)
+        return rho, mu
+
+    @timed("props")
+    def props_array(self, T_K, P_Pa):
+        from .properties import water_props_array
+        return water_props_array(T_K, P_Pa)
+
+    def cp_array(self, T_K, P_Pa):
+        return coolprop_backend(self.fluid).cp_array(T_K, P_Pa)
+
+    def saturation(self, P_Pa):
+        return coolprop_backend(self.fluid).saturation(P_Pa)
+
+    def speed_sound(self, T_K, P_Pa):
+        return coolprop_backend(self.fluid).speed_sound(T_K, P_Pa)
+
+    def vapour_pressure(self, T_K):
+        return coolprop_backend(self.fluid).vapour_pressure(T_K)
+
+
+@lru_cache(maxsize=None)
+@timed("props")
+def get_backend(fluid="Water"):
+    """Shared backend for ``fluid``, created on first use."""
+    return WaterBackend() if fluid == "Water" else CoolPropBackend(fluid)
+
+
+@lru_cache(maxsize=None)
+@timed("props")
+def coolprop_backend(fluid):
+    """Plain CoolProp backend without the water grid (used to build and back the grid itself)."""
+    return CoolPropBackend(fluid)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _fluid_state_cached(fluid, T_K, P_Pa):
+    return get_backend(fluid).state(T_K, P_Pa)
+
+
+def fluid_state(T_K, P_Pa, fluid="Water"):
+    """Cached (rho, mu, phase) for one state; keys rounded like properties.water_props."""
+    return _fluid_state_cached(fluid, round(float(T_K), 3), round(float(P_Pa), 0))
@@ -0,0 +1,100 @@
+"""Single-case hydraulics: pipe ID lookup and pressure drop / pump power.
+
+Only the standard library is imported here; the property backend (NumPy,
+CoolProp) is loaded on the first calculation.
+"""
+import math
+
+from .catalogue import lookup
+from .data import material_list_roughness
+from .instrument import timed
+
+def get_ID(nps, sch):
+    d = lookup(nps, sch)
+    return None if d is None else d["ID"]
+
+# --- REYNOLDS KONTROLÜ ---
+def friction_factor(Re, roughness_mm, ID_m):
+    """Darcy friction factor: Haaland for Re >= 2300, 64/Re below, 0 for no flow."""
+    if Re >= 2300:
+        return (-1.8 * math.log10((roughness_mm/1000/ID_m/3.7)**1.11 + 6.9/Re))**-2
+    elif Re > 0:
+        return 64 / Re
+    return 0
+
+# --- GELİŞMİŞ HESAPLAMA FONKSİYONU ---
+@timed("calc")
+def calculate_hydraulics(temp_c, flow_th, press_bar, length_m, fitting_len_m, elevation_m, pump_eff, material, nps, sch,
+                         fluid="Water", quality=None, two_phase_model="homogeneous"):
+    """Pressure drop, velocity and pump power for one line; None for an unknown pipe.
+
+    ``fluid`` is any fluids.get_backend name. With ``quality`` (vapour mass
+    fraction) the line is two-phase at the saturation temperature for
+    ``press_bar`` (``temp_c`` is ignored) and ``two_phase_model`` is
+    "homogeneous" or "lockhart_martinelli". States the property backend
+    cannot evaluate raise fluids.PropertyError.
+    """
+    from .fluids import fluid_state, get_backend
+
+    roughness = material_list_roughness.get(material, 0.045)
+
+    d_info = lookup(nps, sch)
+    if d_info is None:
+        return None
+
+    ID_mm = d_info["ID"]
+
+    if ID_mm <= 0: return None
+
+    ID_m = ID_mm / 1000.0
+
+    T_K = temp_c + 273.15
+    P_Pa = press_bar * 100000
+    m_kg_s = flow_th * 1000 / 3600
+    Area = d_info["flow_area_m2"]
+    total_effective_length = length_m + fitting_len_m
+
+    if quality is None:
+        rho, mu, phase = fluid_state(T_K, P_Pa, fluid)
+
+        velocity = m_kg_s / (rho * Area)
+        Re = (rho * velocity * ID_m) / mu
+
+        f = friction_factor(Re, roughness, ID_m)
+
+        dP_friction_Pa = f * (total_effective_length / ID_m) * (rho * velocity**2 / 2)
+        rho_static = rho
+    else:
+        from .twophase import two_phase_gradient
+        tp = two_phase_gradient(two_phase_model, m_kg_s / Area, quality, get_backend(fluid).saturation(P_Pa),
+                                ID_m, roughness)
+        rho, rho_static, mu, Re, f, velocity = tp["rho_h"], tp["rho"], tp["mu"], tp["re"], tp["f"], tp["vel"]
+        dP_friction_Pa = tp["dpdl"] * total_effective_length
+        phase = "two-phase"
+
+    g = 9.81
+    dP_static_Pa = rho_static * g * elevation_m
+    dP_total_Pa = dP_friction_Pa + dP_static_Pa
+    dP_total_bar = dP_total_Pa / 100000
+
+    head_m = dP_total_Pa / (rho_static * g)
+
+    flow_m3_h = flow_th / (rho_static / 1000)
+    power_hydraulic_kW = (flow_m3_h * head_m * rho_static * g) / (3.6 * 1e6)
+
+    eff_factor = pump_eff / 100.0 if pump_eff > 0 else 0.01
+    power_shaft_kW = power_hydraulic_kW / eff_factor
+
+    return {
+        "dp_total": dP_total_bar,
+        "dp_friction": dP_friction_Pa/100000,
+        "dp_static": dP_static_Pa/100000,
+        "head_m": head_m,
+        "vel": velocity,
+        "re": Re, "f": f,
+        "rho": rho_static, "mu": mu, "id_mm": ID_mm,
+        "power_hyd": power_hydraulic_kW,
+        "power_shaft": power_shaft_kW,
+        "total_len": total_effective_length,
+        "phase": phase,
+    }
@@ -0,0 +1,189 @@
+"""Stage timing for app reruns, plus optional one-rerun profiling.
+
+Only the standard library is used here, so the core modules can import it.
+
+    rerun = start_rerun(page="Pressure Drop")  # top of the script
+    with stage("chart", "pressure breakdown"):
+        ...
+    summary = rerun.finish()                   # dict, also logged as JSON
+
+The core marks its own hot spots with @timed: calculations ("calc"),
+property lookups ("props") and SQLite calls ("db"). Microsecond-scale
+arithmetic (check_wall_thickness, get_ID) is left undecorated: the wrapper
+costs about 0.35 µs per call, a third of such a call. Stages nest. Each one
+records its total time and its self time (total minus nested stages), so
+a calculation's CoolProp time is counted once, under "props". Anything not
+inside a stage (Streamlit widgets, pandas glue) is reported as "other".
+
+Outside a rerun there is no active recorder: scripts, tests, sweep workers
+and threads all see None. A decorated function then only pays for one
+ContextVar lookup.
+
+Finished reruns are logged to the ``hydraulicsuite.perf`` logger as one
+JSON object per line once configure_json_log() attaches a handler. The
+app only does so when HYDRAULICSUITE_PERF_LOG is set (a file path, or "-"
+for stderr); otherwise summaries go nowhere but the diagnostics panel.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+LOGGER_NAME = "hydraulicsuite.perf"
+PROFILERS = ("cProfile", "pyinstrument")
+PROFILE_LINES = 40
+
+log = logging.getLogger(LOGGER_NAME)
+_current = contextvars.ContextVar("hydraulicsuite_rerun", default=None)
+
+
+class Rerun:
+    """Timings of one script run; create with start_rerun()."""
+
+    def __init__(self, **context):
+        self.context = context
+        self.stages = {}  # (kategori, ad) -> [çağrı, toplam_s, öz_s]
+        self._stack = []  # açık aşamaların alt-aşama süreleri
+        self._t0 = time.perf_counter()
+
+    def _enter(self):
+        self._stack.append(0.0)
+        return time.perf_counter()
+
+    def _exit(self, category, name, t0):
+        dt = time.perf_counter() - t0
+        children = self._stack.pop()
+        if self._stack:
+            self._stack[-1] += dt
+        s = self.stages.setdefault((category, name), [0, 0.0, 0.0])
+        s[0] += 1
+        s[1] += dt
+        s[2] += dt - children
+
+    def finish(self):
+        """Stop recording; returns (and logs) the summary dict.
+
+        Keys: the start_rerun context, total_ms, by_category (self ms per
+        category, including "other") and stages (category, name, calls,
+        total_ms, self_ms; slowest first).
+        """
+        total = time.perf_counter() - self._t0
+        if _current.get() is self:
+            _current.set(None)
+        stages = sorted(({"category": c, "name": n, "calls": k, "total_ms": t * 1000, "self_ms": s * 1000}
+                         for (c, n), (k, t, s) in self.stages.items()), key=lambda r: -r["self_ms"])
+        by_category = {}
+        for r in stages:
+            by_category[r["category"]] = by_category.get(r["category"], 0.0) + r["self_ms"]
+        by_category["other"] = total * 1000 - sum(by_category.values())
+        summary = {"event": "rerun", **self.context, "total_ms": total * 1000,
+                   "by_category": by_category, "stages": stages}
+        if log.isEnabledFor(logging.INFO):
+            log.info(json.dumps(summary, default=str))
+        return summary
+
+
+def start_rerun(**context):
+    """Start recording stages in this thread/context; ``context`` goes into the summary."""
+    rerun = Rerun(**context)
+    _current.set(rerun)
+    return rerun
+
+
+@contextmanager
+def stage(category, name):
+    rerun = _current.get()
+    if rerun is None:
+        yield
+        return
+    t0 = rerun._enter()
+    try:
+        yield
+    finally:
+        rerun._exit(category, name, t0)
+
+
+def timed(category, name=None):
+    """Decorator: run the function as a ``stage(category, name or its __qualname__)``."""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            rerun = _current.get()
+            if rerun is None:
+                return fn(*args, **kwargs)
+            t0 = rerun._enter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                rerun._exit(category, label, t0)
+        return wrapper
+    return decorate
+
+
+def configure_json_log(path=None, level=logging.INFO):
+    """Send rerun summaries to ``path`` (stderr if None, "-" or "stderr") as JSON lines; a no-op if already configured."""
+    if log.handlers:
+        return log
+    to_stderr = path in (None, "-", "stderr")
+    handler = logging.StreamHandler() if to_stderr else logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(handler)
+    log.setLevel(level)
+    log.propagate = False
+    return log
+
+
+def available_profilers():
+    import importlib.util
+    return [p for p in PROFILERS if p == "cProfile" or importlib.util.find_spec(p) is not None]
+
+
+class RerunProfiler:
+    """cProfile or pyinstrument around one rerun: start() at the top, stop() at the end.
+
+    stop() returns dict engine, text (the report), data (bytes for download:
+    a .prof pstats dump or pyinstrument HTML) and file_name.
+    """
+
+    def __init__(self, engine="cProfile"):
+        if engine not in PROFILERS:
+            raise ValueError(f"engine must be one of {PROFILERS}")
+        self.engine = engine
+        self._p = None
+
+    def start(self):
+        if self.engine == "cProfile":
+            import cProfile
+            self._p = cProfile.Profile()
+            self._p.enable()
+        else:
+            from pyinstrument import Profiler
+            self._p = Profiler()
+            self._p.start()
+        return self
+
+    def stop(self):
+        if self.engine == "cProfile":
+            import io
+            import pstats
+            import tempfile
+            self._p.disable()
+            out = io.StringIO()
+            pstats.Stats(self._p, stream=out).sort_stats("cumulative").print_stats(PROFILE_LINES)
+            fd, tmp = tempfile.mkstemp(suffix=".prof")
+            os.close(fd)
+            try:
+                self._p.dump_stats(tmp)
+                with open(tmp, "rb") as f:
+                    data = f.read()
+            finally:
+                os.remove(tmp)
+            return {"engine": self.engine, "text": out.getvalue(), "data": data, "file_name": "rerun.prof"}
+        self._p.stop()
+        return {"engine": self.engine, "text": self._p.output_text(unicode=True, color=False),
+                "data": self._p.output_html().encode("utf-8"), "file_name": "rerun.html"}
@@ -0,0 +1,209 @@
+"""Branched / looped pipe networks solved with a sparse Newton method.
+
+The network is nodes + pipes:
+
+* node: ``{"id", "elevation_m", "demand_th"}`` for junctions (demand is the
+  mass flow leaving the network there, negative for an injection), or
+  ``{"id", "elevation_m", "pressure_bar"}`` / ``{"id", "head_m"}`` for fixed
+  pressure boundaries (tanks, headers, pump discharge). At least one node must
+  be fixed.
+* pipe: ``{"id", "from", "to", "nps", "sch", "material", "length_m"}`` plus
+  optionally ``fitting_len_m`` or ``fittings`` ({fitting name: qty}, Le/D
+  from fitting_led_database as on the Pressure Drop page). Positive flow
+  runs from ``from`` to ``to``.
+
+Instead of loop-by-loop Hardy-Cross corrections, all pipe flows Q and
+junction heads H are updated together (global gradient / Todini-Pilati form
+of Newton's method). Each iteration solves one sparse, symmetric positive
+definite system A^T G^-1 A dH = ... over the junctions, so cost grows about
+linearly with network size; 10k pipes solve in well under a second.
+Friction uses the same Haaland / laminar factor as calculate_hydraulics
+(bridged smoothly across 2000 <= Re < 2300, see network_friction_factor), with a
+single water state (temp_c, press_bar) for the whole network.
+"""
+import numpy as np
+import pandas as pd
+
+from .batch import friction_factor_array
+from .data import fitting_led_database, material_list_roughness, pipe_database
+from .instrument import timed
+from .properties import water_props
+
+G = 9.81
+Q_FLOOR = 1e-9  # m3/s; keeps the Jacobian finite for pipes with no flow
+RE_BLEND = (2000.0, 2300.0)
+
+
+def network_friction_factor(Re, roughness_mm, ID_m):
+    """friction_factor_array with the laminar -> Haaland jump at Re 2300 bridged by a
+    cubic over RE_BLEND (value and slope match both ends); returns (f, d ln f / d ln Re).
+
+    A Newton iteration cycles forever on a discontinuous h(Q). Outside RE_BLEND
+    the values are identical to calculate_hydraulics.
+    """
+    Re = np.asarray(Re, dtype=float)
+    f = friction_factor_array(Re, roughness_mm, ID_m)
+    slope = np.where(Re >= RE_BLEND[0], 0.0, -1.0)  # Haaland ~ düz, laminer 64/Re
+    lo, hi = RE_BLEND
+    band = (Re >= lo) & (Re < hi)
+    if band.any():
+        r = np.broadcast_to(roughness_mm, Re.shape)[band]
+        d = np.broadcast_to(ID_m, Re.shape)[band]
+        f1 = friction_factor_array(hi, r, d)
+        df1 = (friction_factor_array(hi * 1.001, r, d) - f1) / (hi * 0.001)
+        f0, df0 = 64 / lo, -64 / lo ** 2
+        w = hi - lo
+        t = (Re[band] - lo) / w
+        h00, h10, h01, h11 = 2*t**3 - 3*t**2 + 1, t**3 - 2*t**2 + t, -2*t**3 + 3*t**2, t**3 - t**2
+        fb = h00 * f0 + h10 * w * df0 + h01 * f1 + h11 * w * df1
+        dfb = ((6*t**2 - 6*t) * f0 + (3*t**2 - 4*t + 1) * w * df0
+               + (-6*t**2 + 6*t) * f1 + (3*t**2 - 2*t) * w * df1) / w
+        f[band] = fb
+        slope[band] = dfb * Re[band] / fb
+    return f, slope
+
+
+def _records(items):
+    if isinstance(items, pd.DataFrame):
+        return items.to_dict("records")
+    return list(items)
+
+
+def _pipe_arrays(pipes, node_index):
+    n = len(pipes)
+    ID_m = np.empty(n)
+    length = np.empty(n)
+    rough = np.empty(n)
+    i_from = np.empty(n, dtype=int)
+    i_to = np.empty(n, dtype=int)
+    for k, p in enumerate(pipes):
+        nps, sch = p["nps"], p["sch"]
+        if nps not in pipe_database or sch not in pipe_database[nps]:
+            raise ValueError(f"Pipe {p.get('id', k)}: unknown size {nps} / Sch {sch}")
+        d = pipe_database[nps][sch]
+        ID_m[k] = d["ID"] / 1000.0
+        fit_len = p.get("fitting_len_m")
+        if fit_len is None:
+            fit_len = sum(qty * fitting_led_database[name] for name, qty in (p.get("fittings") or {}).items()) * ID_m[k]
+        length[k] = p["length_m"] + fit_len
+        rough[k] = material_list_roughness.get(p.get("material"), 0.045)
+        try:
+            i_from[k] = node_index[p["from"]]
+            i_to[k] = node_index[p["to"]]
+        except KeyError as e:
+            raise ValueError(f"Pipe {p.get('id', k)}: unknown node {e.args[0]}") from None
+    return ID_m, length, rough, i_from, i_to
+
+
+def _incidence(i_from, i_to, col_of, n_cols):
+    """Sparse pipe x node matrix: +1 at the start node, -1 at the end node (selected columns only)."""
+    import scipy.sparse as sp
+    rows, cols, vals = [], [], []
+    for idx, sign in ((i_from, 1.0), (i_to, -1.0)):
+        c = col_of[idx]
+        keep = c >= 0
+        rows.append(np.flatnonzero(keep))
+        cols.append(c[keep])
+        vals.append(np.full(keep.sum(), sign))
+    return sp.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                         shape=(len(i_from), n_cols))
+
+
+@timed("calc")
+def solve_network(nodes, pipes, temp_c=20.0, press_bar=10.0, tol=1e-8, max_iter=50):
+    """Solve flows and pressures; returns {"pipes", "nodes", "iterations", "converged", "residual"}.
+
+    ``pipes`` gets flow_th, vel, re, f, headloss_m and dp_friction (bar) per
+    pipe; ``nodes`` gets head_m, pressure_bar and the resulting net outflow
+    (demand_th at junctions, minus the supply at fixed nodes).
+    """
+    from scipy.sparse import diags
+    from scipy.sparse.linalg import spsolve
+
+    nodes, pipes = _records(nodes), _records(pipes)
+    node_ids = [n["id"] for n in nodes]
+    node_index = {nid: i for i, nid in enumerate(node_ids)}
+    if len(node_index) != len(nodes):
+        raise ValueError("Duplicate node ids")
+
+    rho, mu = water_props(temp_c + 273.15, press_bar * 1e5)
+    z = np.array([float(n.get("elevation_m", 0.0)) for n in nodes])
+    fixed = np.array([("head_m" in n) or ("pressure_bar" in n) for n in nodes])
+    if not fixed.any():
+        raise ValueError("Network needs at least one fixed pressure/head node")
+    H = np.where(fixed, 0.0, np.nan)
+    for i, n in enumerate(nodes):
+        if "head_m" in n:
+            H[i] = n["head_m"]
+        elif "pressure_bar" in n:
+            H[i] = z[i] + n["pressure_bar"] * 1e5 / (rho * G)
+    demand = np.array([0.0 if fixed[i] else float(n.get("demand_th", 0.0)) for i, n in enumerate(nodes)])
+    q_demand = demand * 1000 / 3600 / rho  # m3/s
+
+    ID_m, length, rough, i_from, i_to = _pipe_arrays(pipes, node_index)
+    area = np.pi * (ID_m / 2) ** 2
+    junctions = np.flatnonzero(~fixed)
+    col_of = np.full(len(nodes), -1)
+    col_of[junctions] = np.arange(len(junctions))
+    col_fixed = np.full(len(nodes), -1)
+    col_fixed[np.flatnonzero(fixed)] = np.arange(fixed.sum())
+    A = _incidence(i_from, i_to, col_of, len(junctions))
+    A0 = _incidence(i_from, i_to, col_fixed, int(fixed.sum()))
+    At = A.T.tocsr()
+    A0H0 = A0 @ H[fixed]
+
+    def headloss(Q):
+        """h(Q) [m] and dh/dQ for every pipe."""
+        vel = Q / area
+        Re = rho * np.abs(vel) * ID_m / mu
+        f, slope = network_friction_factor(Re, rough, ID_m)
+        h = f * (length / ID_m) * vel * np.abs(vel) / (2 * G)
+        # h ~ f(Re) Q|Q| -> dh/dQ = (2 + dlnf/dlnRe) h/Q; laminerde sabit eğim
+        qa = np.maximum(np.abs(Q), Q_FLOOR)
+        k_lam = 128 * mu * length / (np.pi * rho * G * ID_m ** 4)
+        dh = np.where(Re >= RE_BLEND[0], (2 + slope) * np.abs(h) / qa, k_lam)
+        return h, np.maximum(dh, k_lam), vel, Re, f
+
+    # Başlangıç: 1 m/s her boruda
+    Q = area * 1.0
+    H_j = np.full(len(junctions), H[fixed].max())
+    converged = False
+    residual = np.inf
+    step = 1.0
+    for it in range(1, max_iter + 1):
+        h, dh, *_ = headloss(Q)
+        F1 = h - (A @ H_j) - A0H0
+        F2 = At @ Q + q_demand[junctions]
+        Ginv = 1.0 / dh
+        M = (At @ diags(Ginv) @ A).tocsc()
+        rhs = At @ (Ginv * F1) - F2
+        dH = spsolve(M, rhs) if len(junctions) else np.zeros(0)
+        dQ = Ginv * (A @ dH - F1)
+        last, residual = residual, np.abs(dQ).max() / max(np.abs(Q).max(), Q_FLOOR)
+        if residual < tol:
+            H_j, Q = H_j + dH, Q + dQ
+            converged = True
+            break
+        # Rejim sınırında (laminer <-> geçiş) iki noktalı salınımı sönümle
+        step = max(0.5 * step, 0.05) if residual > last else min(1.0, 2 * step)
+        H_j = H_j + step * dH
+        Q = Q + step * dQ
+
+    h, dh, vel, Re, f = headloss(Q)
+    H[junctions] = H_j
+    net_out = np.zeros(len(nodes))
+    np.add.at(net_out, i_from, Q)
+    np.add.at(net_out, i_to, -Q)
+
+    pipe_df = pd.DataFrame({
+        "id": [p.get("id", k) for k, p in enumerate(pipes)],
+        "from": [p["from"] for p in pipes], "to": [p["to"] for p in pipes],
+        "flow_th": Q * rho * 3600 / 1000, "vel": vel, "re": Re, "f": f,
+        "headloss_m": h, "dp_friction": h * rho * G / 1e5, "id_mm": ID_m * 1000, "total_len": length,
+    })
+    node_df = pd.DataFrame({
+        "id": node_ids, "fixed": fixed, "elevation_m": z, "head_m": H,
+        "pressure_bar": (H - z) * rho * G / 1e5,
+        "demand_th": -net_out * rho * 3600 / 1000,
+    })
+    return {"pipes": pipe_df, "nodes": node_df, "iterations": it, "converged": converged, "residual": residual}
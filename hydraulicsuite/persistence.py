@@ -0,0 +1,287 @@
+"""SQLite persistence for saved calculations.
+
+One ProjectStore per database file is meant to be shared by every session
+(webapp.py wraps it in ``st.cache_resource``). The connection runs in WAL
+mode so readers never block the writer, writes are serialised with a lock,
+and the schema is versioned through ``PRAGMA user_version``: MIGRATIONS are
+applied in order on open, each exactly once and in one transaction with its
+version bump.
+
+Name/material/NPS search runs on an FTS5 index kept in step by triggers.
+Bulk inserts (insert_many, insert_sweep_results) drop the per-row insert
+trigger for the batch and index the new rows with one INSERT ... SELECT,
+in the same transaction; that is about 4x faster than the trigger for a
+10k-row batch, though still about twice the cost of an unindexed insert.
+"""
+import re
+import sqlite3
+import threading
+
+from .instrument import timed
+
+PROJECT_COLUMNS = ["name", "material", "nps", "sch", "pressure_drop", "velocity", "safety_factor"]
+
+
+def _create_projects(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS projects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            material TEXT,
+            nps TEXT,
+            sch TEXT,
+            pressure_drop REAL,
+            velocity REAL,
+            safety_factor REAL
+        )
+    """)
+
+
+def _add_missing_columns(conn):
+    # Eski veritabanlarında bulunmayan kolonlar
+    have = {row[1] for row in conn.execute("PRAGMA table_info(projects)")}
+    for col, decl in [("timestamp", "DATETIME"), ("sch", "TEXT"), ("pressure_drop", "REAL"),
+                      ("velocity", "REAL"), ("safety_factor", "REAL")]:
+        if col not in have:
+            conn.execute(f"ALTER TABLE projects ADD COLUMN {col} {decl}")
+
+
+def _create_indexes(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_projects_name ON projects(name COLLATE NOCASE)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_projects_material ON projects(material COLLATE NOCASE)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_projects_timestamp ON projects(timestamp)")
+
+
+FTS_INSERT_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS projects_fts_ai AFTER INSERT ON projects BEGIN
+        INSERT INTO projects_fts(rowid, name, material, nps) VALUES (new.id, new.name, new.material, new.nps);
+    END
+"""
+FTS_TRIGGERS = [
+    FTS_INSERT_TRIGGER,
+    """
+    CREATE TRIGGER IF NOT EXISTS projects_fts_ad AFTER DELETE ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, name, material, nps) VALUES ('delete', old.id, old.name, old.material, old.nps);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS projects_fts_au AFTER UPDATE ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, name, material, nps) VALUES ('delete', old.id, old.name, old.material, old.nps);
+        INSERT INTO projects_fts(rowid, name, material, nps) VALUES (new.id, new.name, new.material, new.nps);
+    END
+    """,
+]
+
+
+def _create_search_index(conn):
+    # name/material/nps üzerinde FTS5; projects tablosunu tetikleyicilerle izler.
+    # executescript açık işlemi commit eder; tek tek execute ile göç atomik kalır
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
+            name, material, nps, content='projects', content_rowid='id', prefix='2 3'
+        )
+    """)
+    for sql in FTS_TRIGGERS:
+        conn.execute(sql)
+    conn.execute("INSERT INTO projects_fts(projects_fts) VALUES ('rebuild')")
+
+
+# (version, migration) - append only; never edit a migration that has shipped
+MIGRATIONS = [
+    (1, _create_projects),
+    (2, _add_missing_columns),
+    (3, _create_indexes),
+    (4, _create_search_index),
+]
+
+
+def fts_query(term):
+    """User text -> FTS5 query: every word must match as a prefix. None if no words."""
+    words = re.findall(r"\w+", term or "")
+    if not words:
+        return None
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def migrate(conn):
+    """Apply pending MIGRATIONS; returns the resulting schema version."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target, step in MIGRATIONS:
+        if target <= version:
+            continue
+        with conn:
+            conn.execute("BEGIN")  # sqlite3 DDL'den önce işlem açmaz
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {target}")
+        version = target
+    return version
+
+
+class ProjectStore:
+    """Shared, thread-safe access to the ``projects`` table."""
+
+    @timed("db")
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        self._lock = threading.RLock()
+        self.conn = self._connect()
+        with self._lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.schema_version = migrate(self.conn)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    @timed("db")
+    def insert_project(self, name, material, nps, sch, pressure_drop, velocity, safety_factor=None):
+        with self._lock, self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO projects (name, material, nps, sch, pressure_drop, velocity, safety_factor) VALUES (?,?,?,?,?,?,?)",
+                (name, material, nps, sch, pressure_drop, velocity, safety_factor))
+            return cur.lastrowid
+
+    @timed("db")
+    def set_safety_factor(self, project_id, safety_factor):
+        """Attach a wall-check safety factor to a saved project; returns False if the id does not exist."""
+        with self._lock, self.conn:
+            cur = self.conn.execute("UPDATE projects SET safety_factor = ? WHERE id = ?", (safety_factor, project_id))
+            return cur.rowcount > 0
+
+    @timed("db")
+    def insert_many(self, rows, batch_size=10_000):
+        """Bulk insert tuples ordered as PROJECT_COLUMNS, one transaction per batch."""
+        sql = f"INSERT INTO projects ({', '.join(PROJECT_COLUMNS)}) VALUES ({', '.join('?' * len(PROJECT_COLUMNS))})"
+        total = 0
+        batch = []
+        for row in rows:
+            batch.append(tuple(row))
+            if len(batch) >= batch_size:
+                total += self._executemany(sql, batch)
+                batch = []
+        if batch:
+            total += self._executemany(sql, batch)
+        return total
+
+    def _executemany(self, sql, batch):
+        with self._lock, self.conn:
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN")
+            # Satır başına FTS tetikleyicisi yerine yeni satırlar tek seferde indekslenir
+            self.conn.execute("DROP TRIGGER IF EXISTS projects_fts_ai")
+            last = self.conn.execute("SELECT coalesce(max(id), 0) FROM projects").fetchone()[0]
+            self.conn.executemany(sql, batch)
+            self.conn.execute("INSERT INTO projects_fts(rowid, name, material, nps) "
+                              "SELECT id, name, material, nps FROM projects WHERE id > ?", (last,))
+            self.conn.execute(FTS_INSERT_TRIGGER)
+        return len(batch)
+
+    def insert_sweep_results(self, df, name, batch_size=10_000):
+        """Store the valid rows of a sweep/batch result frame as projects."""
+        if "valid" in df:
+            df = df[df["valid"]]
+        rows = zip([name] * len(df), df["material"].tolist(), df["nps"].tolist(), df["sch"].tolist(),
+                   df["dp_total"].astype(float).tolist(), df["vel"].astype(float).tolist(), [None] * len(df))
+        return self.insert_many(rows, batch_size)
+
+    @timed("db")
+    def read_df(self, sql, params=()):
+        import pandas as pd
+        with self._lock:
+            return pd.read_sql(sql, self.conn, params=params)
+
+    @timed("db")
+    def execute(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def iter_chunks(self, sql, params=(), chunksize=5000):
+        """DataFrame chunks from a private read connection (WAL: never blocks writers)."""
+        import pandas as pd
+        conn = self._connect()
+        try:
+            yield from pd.read_sql(sql, conn, params=params, chunksize=chunksize)
+        finally:
+            conn.close()
+
+    # --- ARAMA & SAYFALAMA ---
+    def _search_filter(self, term):
+        q = fts_query(term)
+        if q is None:
+            return "", ()
+        return "id IN (SELECT rowid FROM projects_fts WHERE projects_fts MATCH ?)", (q,)
+
+    @timed("db")
+    def page_projects(self, term="", before_id=None, limit=50):
+        """One page of projects, newest first, with ``id < before_id`` (keyset pagination).
+
+        The cost depends on ``limit`` only, not on how deep the page is.
+        """
+        q = fts_query(term)
+        if q is not None:
+            inner = "SELECT rowid FROM projects_fts WHERE projects_fts MATCH ?"
+            params = [q]
+            if before_id is not None:
+                inner += " AND rowid < ?"
+                params.append(before_id)
+            sql = f"SELECT * FROM projects WHERE id IN ({inner} ORDER BY rowid DESC LIMIT ?) ORDER BY id DESC"
+        else:
+            params = []
+            sql = "SELECT * FROM projects"
+            if before_id is not None:
+                sql += " WHERE id < ?"
+                params.append(before_id)
+            sql += " ORDER BY id DESC LIMIT ?"
+        params.append(int(limit))
+        return self.read_df(sql, tuple(params))
+
+    @timed("db")
+    def count_projects(self, term=""):
+        where, params = self._search_filter(term)
+        sql = "SELECT count(*) FROM projects" + (f" WHERE {where}" if where else "")
+        return self.execute(sql, params)[0][0]
+
+    def iter_search(self, term="", chunksize=5000):
+        """All matches for ``term`` (newest first) as DataFrame chunks, for exports."""
+        where, params = self._search_filter(term)
+        sql = "SELECT * FROM projects" + (f" WHERE {where}" if where else "") + " ORDER BY id DESC"
+        return self.iter_chunks(sql, params, chunksize)
+
+    # --- TOPLU İSTATİSTİKLER ---
+    @timed("db")
+    def material_counts(self):
+        """Projects per material, computed in SQL."""
+        return self.read_df("SELECT material, count(*) AS count FROM projects "
+                            "WHERE material IS NOT NULL GROUP BY material ORDER BY count DESC")
+
+    @timed("db")
+    def velocity_histogram(self, nbins=10):
+        """Equal-width velocity histogram over [min, max] as bin_start/bin_end/count rows.
+
+        Binning happens in SQL, so the result is ``nbins`` rows whatever the table size.
+        """
+        import pandas as pd
+        lo, hi = self.execute("SELECT min(velocity), max(velocity) FROM projects WHERE velocity IS NOT NULL")[0]
+        if lo is None:
+            return pd.DataFrame(columns=["bin_start", "bin_end", "count"])
+        width = (hi - lo) / nbins or 1.0
+        counts = dict(self.execute(
+            "SELECT min(CAST((velocity - ?) / ? AS INTEGER), ?) AS b, count(*) FROM projects "
+            "WHERE velocity IS NOT NULL GROUP BY b", (lo, width, nbins - 1)))
+        edges = [lo + i * width for i in range(nbins + 1)]
+        return pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:],
+                             "count": [counts.get(i, 0) for i in range(nbins)]})
+
+    @timed("db")
+    def last_id(self):
+        """Highest project id; changes on every insert, so it doubles as a cache key."""
+        return self.execute("SELECT max(id) FROM projects")[0][0] or 0
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,175 @@
+"""Water density/viscosity provider for the hydraulics engine.
+
+Two layers sit in front of CoolProp:
+
+* a precomputed liquid-water grid over the app's operating envelope
+  (GRID_T_C x GRID_P_BAR), bilinearly interpolated. Node values come from
+  PropsSI; cells that touch the saturation line or the vapour region are left
+  empty so interpolation never crosses a phase boundary. The worst relative
+  error measured at every cell centre is stored with the grid
+  (``max_rel_err_rho`` / ``max_rel_err_mu``); for the shipped grid it is about
+  2e-6 for density and 2.5e-4 for viscosity (worst in the cells next to 0 °C).
+* a bounded LRU cache keyed on (T, P) rounded to CACHE_T_DECIMALS /
+  CACHE_P_DECIMALS for scalar lookups.
+
+CoolProp is only called for states outside the grid, through the shared
+AbstractState of fluids.coolprop_backend("Water"). The grid is stored in
+water_props_grid.npz next to this file and rebuilt
+(python -m hydraulicsuite.properties) only if the file is missing or its
+envelope no longer matches. CoolProp itself is imported on first use, so
+in-grid lookups never load it.
+"""
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from .instrument import timed
+
+FLUID = "Water"
+
+# --- GRID SINIRLARI ---
+GRID_T_C = (0.5, 250.0, 1.0)      # start, stop, step [°C]
+GRID_P_BAR = (1.0, 150.0, 1.0)    # start, stop, step [bar]
+GRID_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "water_props_grid.npz")
+
+CACHE_SIZE = 4096
+CACHE_T_DECIMALS = 3   # 0.001 K
+CACHE_P_DECIMALS = 0   # 1 Pa
+
+
+def _axis(spec):
+    start, stop, step = spec
+    return np.round(np.arange(start, stop + step / 2, step), 9)
+
+
+@timed("props")
+def _PropsSI(*args):
+    from CoolProp.CoolProp import PropsSI
+    return PropsSI(*args)
+
+
+def _props_coolprop(T_K, P_Pa):
+    """Vectorized CoolProp lookup; states CoolProp rejects are NaN."""
+    from .fluids import coolprop_backend
+    return coolprop_backend(FLUID).props_array(T_K, P_Pa)
+
+
+def _liquid_nodes(T_K, P_Pa):
+    """Density/viscosity on a mesh; non-liquid or failed nodes are NaN."""
+    T_crit = _PropsSI('Tcrit', FLUID)
+    P_crit = _PropsSI('pcrit', FLUID)
+    rho = np.full(T_K.shape, np.nan)
+    mu = np.full(T_K.shape, np.nan)
+    for j, P in enumerate(P_Pa[0]):
+        T_sat = _PropsSI('T', 'P', P, 'Q', 0, FLUID) if P < P_crit else T_crit
+        liquid = T_K[:, j] < T_sat
+        if liquid.any():
+            rho[liquid, j], mu[liquid, j] = _props_coolprop(T_K[liquid, j], P_Pa[liquid, j])
+    return rho, mu
+
+
+def build_grid(path=GRID_FILE):
+    """Evaluate the grid with CoolProp, measure its error bound and save it."""
+    T_C = _axis(GRID_T_C)
+    P_bar = _axis(GRID_P_BAR)
+    T_K, P_Pa = np.meshgrid(T_C + 273.15, P_bar * 1e5, indexing="ij")
+    rho, mu = _liquid_nodes(T_K, P_Pa)
+    rho, mu = rho.astype(np.float32), mu.astype(np.float32)
+
+    # Hata sınırı: her hücre merkezinde CoolProp ile karşılaştır
+    Tm, Pm = np.meshgrid((T_C[:-1] + T_C[1:]) / 2 + 273.15, (P_bar[:-1] + P_bar[1:]) / 2 * 1e5, indexing="ij")
+    rho_ref, mu_ref = _liquid_nodes(Tm, Pm)
+    grid = {"T_C": T_C, "P_bar": P_bar, "rho": rho.astype(float), "mu": mu.astype(float)}
+    rho_i, mu_i, inside = _interp(grid, Tm.ravel(), Pm.ravel())
+    ok = inside & np.isfinite(rho_ref.ravel())
+    err_rho = np.abs(rho_i[ok] / rho_ref.ravel()[ok] - 1).max()
+    err_mu = np.abs(mu_i[ok] / mu_ref.ravel()[ok] - 1).max()
+
+    np.savez_compressed(path, T_C=T_C, P_bar=P_bar,
+                        rho=rho, mu=mu, max_rel_err_rho=err_rho, max_rel_err_mu=err_mu)
+    load_grid.cache_clear()
+    return load_grid(path)
+
+
+@lru_cache(maxsize=None)
+def load_grid(path=GRID_FILE):
+    """Load the persisted grid, rebuilding it if missing or stale."""
+    try:
+        with np.load(path) as f:
+            grid = {k: f[k] for k in f.files}
+        if np.array_equal(grid["T_C"], _axis(GRID_T_C)) and np.array_equal(grid["P_bar"], _axis(GRID_P_BAR)):
+            grid["rho"] = grid["rho"].astype(float)
+            grid["mu"] = grid["mu"].astype(float)
+            return grid
+    except (OSError, KeyError, ValueError):
+        pass
+    load_grid.cache_clear()
+    return build_grid(path)
+
+
+def _interp(grid, T_K, P_Pa):
+    """Vectorized bilinear interpolation; ``inside`` is False where the grid cannot answer."""
+    T_C, P_bar = grid["T_C"], grid["P_bar"]
+    x = (np.asarray(T_K, dtype=float) - 273.15 - T_C[0]) / (T_C[1] - T_C[0])
+    y = (np.asarray(P_Pa, dtype=float) / 1e5 - P_bar[0]) / (P_bar[1] - P_bar[0])
+    inside = (x >= 0) & (x <= len(T_C) - 1) & (y >= 0) & (y <= len(P_bar) - 1)
+    i = np.clip(np.floor(np.where(inside, x, 0)).astype(int), 0, len(T_C) - 2)
+    j = np.clip(np.floor(np.where(inside, y, 0)).astype(int), 0, len(P_bar) - 2)
+    tx = np.where(inside, x - i, 0.0)
+    ty = np.where(inside, y - j, 0.0)
+
+    def bilinear(z):
+        return ((1 - tx) * (1 - ty) * z[i, j] + tx * (1 - ty) * z[i + 1, j]
+                + (1 - tx) * ty * z[i, j + 1] + tx * ty * z[i + 1, j + 1])
+
+    rho = bilinear(grid["rho"])
+    mu = bilinear(grid["mu"])
+    inside &= np.isfinite(rho) & np.isfinite(mu)
+    return rho, mu, inside
+
+
+def water_props_array(T_K, P_Pa):
+    """Density [kg/m3] and viscosity [Pa.s] for arrays of states.
+
+    Grid states are interpolated; the rest go to CoolProp once per unique
+    (T, P). States CoolProp rejects come back as NaN.
+    """
+    T_K, P_Pa = np.broadcast_arrays(np.asarray(T_K, dtype=float), np.asarray(P_Pa, dtype=float))
+    shape = T_K.shape
+    T_K, P_Pa = T_K.ravel(), P_Pa.ravel()
+    rho, mu, inside = _interp(load_grid(), T_K, P_Pa)
+    outside = ~inside
+    if outside.any():
+        rho[outside], mu[outside] = _props_coolprop(T_K[outside], P_Pa[outside])
+    return rho.reshape(shape), mu.reshape(shape)
+
+
+def grid_props(T_K, P_Pa):
+    """(rho, mu) from the liquid grid, or None if the state is outside it."""
+    rho, mu, inside = _interp(load_grid(), np.array([T_K]), np.array([P_Pa]))
+    return (float(rho[0]), float(mu[0])) if inside[0] else None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _water_props_cached(T_K, P_Pa):
+    hit = grid_props(T_K, P_Pa)
+    if hit is not None:
+        return hit
+    from .fluids import coolprop_backend
+    return coolprop_backend(FLUID).props(T_K, P_Pa)
+
+
+def water_props(T_K, P_Pa):
+    """Density [kg/m3] and viscosity [Pa.s] for one state.
+
+    Raises fluids.PropertyError (a ValueError) for states CoolProp cannot
+    evaluate or that sit on the saturation line.
+    """
+    return _water_props_cached(round(float(T_K), CACHE_T_DECIMALS), round(float(P_Pa), CACHE_P_DECIMALS))
+
+
+if __name__ == "__main__":
+    g = build_grid()
+    print(f"{GRID_FILE}: {g['rho'].shape} nodes, "
+          f"max rel err rho={float(g['max_rel_err_rho']):.2e}, mu={float(g['max_rel_err_mu']):.2e}")
@@ -0,0 +1,264 @@
+"""Pump curves, system curves and the operating point between them.
+
+* Pump curves are head [m] and efficiency [%] against volumetric flow
+  [m3/h], read from CSV in long form (one row per test point)::
+
+      pump,flow_m3h,head_m,efficiency_pct
+      P-100,0,42.0,0
+      P-100,20,40.5,55
+      ...
+
+  Each curve is fitted once, as a least-squares polynomial (default) or a
+  monotone PCHIP spline. The fits are memoised on the data points, so loading
+  the same CSV again on a Streamlit rerun reuses them.
+* The system curve is a single calculate_hydraulics_batch call over a flow
+  range: friction + elevation + terminal pressure difference, i.e. the same
+  physics as the Pressure Drop page.
+* Operating points come from a flow grid, using the first crossing of pump
+  and system head, polished with Brent's method. Identical pumps in parallel
+  split the flow, pumps in series add head, and a VFD speed ratio n scales a
+  curve by the affinity laws (Q ~ n, H ~ n^2, same efficiency at similar
+  points).
+* select_pumps evaluates a whole catalogue as one (pumps x grid) array, so
+  several hundred curves take a few milliseconds.
+"""
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .batch import calculate_hydraulics_batch
+from .instrument import timed
+from .properties import water_props
+
+G = 9.81
+PUMP_CURVES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pump_curves.csv")  # örnek katalog
+PUMP_CSV_COLUMNS = ["pump", "flow_m3h", "head_m", "efficiency_pct"]
+GRID_POINTS = 257
+
+
+@lru_cache(maxsize=4096)
+def _fit(method, degree, x, y):
+    x, y = np.asarray(x), np.asarray(y)
+    if method == "pchip":
+        from scipy.interpolate import PchipInterpolator
+        return PchipInterpolator(x, y, extrapolate=False)
+    if method != "poly":
+        raise ValueError(f"Unknown curve fit method: {method}")
+    return np.polynomial.Polynomial.fit(x, y, min(degree, len(x) - 1)).convert().coef
+
+
+def _eval(fit, q):
+    if isinstance(fit, np.ndarray):
+        return np.polynomial.polynomial.polyval(q, fit)
+    return fit(q)
+
+
+def _fit_points(method, degree, x, y):
+    """Fit over the points where ``y`` is given (blank CSV cells are NaN); None if fewer than two remain."""
+    ok = np.isfinite(x) & np.isfinite(y)
+    if ok.sum() < 2:
+        return None
+    return _fit(method, degree, tuple(x[ok]), tuple(y[ok]))
+
+
+class PumpCurve:
+    """One pump at rated speed; ``efficiency_pct`` is optional and may have blank points."""
+
+    def __init__(self, name, flow_m3h, head_m, efficiency_pct=None, method="poly", degree=3):
+        order = np.argsort(flow_m3h)
+        self.name = name
+        self.flow_m3h = np.asarray(flow_m3h, dtype=float)[order]
+        self.head_m = np.asarray(head_m, dtype=float)[order]
+        self.efficiency_pct = None if efficiency_pct is None else np.asarray(efficiency_pct, dtype=float)[order]
+        self.method = method
+        self._head_fit = _fit_points(method, degree, self.flow_m3h, self.head_m)
+        if self._head_fit is None:
+            raise ValueError(f"Pump {name!r} needs at least two points with flow and head")
+        self.q_max = float(np.nanmax(np.where(np.isfinite(self.head_m), self.flow_m3h, np.nan)))
+        self._eff_fit = (None if self.efficiency_pct is None
+                         else _fit_points(method, degree, self.flow_m3h, self.efficiency_pct))
+
+    def __repr__(self):
+        return f"PumpCurve({self.name!r}, q_max={self.q_max:g} m3/h)"
+
+    def head(self, flow_m3h, speed=1.0, parallel=1, series=1):
+        """Head [m] of the arrangement at total flow ``flow_m3h``; NaN off the curve."""
+        q = np.asarray(flow_m3h, dtype=float) / (speed * parallel)
+        h = np.where((q >= 0) & (q <= self.q_max), _eval(self._head_fit, np.clip(q, 0, self.q_max)), np.nan)
+        return series * speed ** 2 * h
+
+    def efficiency(self, flow_m3h, speed=1.0, parallel=1):
+        """Efficiency [%] at total flow; the affinity laws keep it constant along similar points."""
+        q = np.asarray(flow_m3h, dtype=float) / (speed * parallel)
+        if self._eff_fit is None:
+            return np.full(q.shape, np.nan)
+        e = _eval(self._eff_fit, np.clip(q, 0, self.q_max))
+        return np.where((q >= 0) & (q <= self.q_max), np.clip(e, 0, 100), np.nan)
+
+
+@timed("calc")
+def load_pump_curves(source, method="poly", degree=3):
+    """Read a long-form pump CSV (path or file object) into {name: PumpCurve}."""
+    df = pd.read_csv(source)
+    missing = [c for c in PUMP_CSV_COLUMNS[:3] if c not in df]
+    if missing:
+        raise ValueError(f"Pump curve file is missing columns: {missing}")
+    eff = "efficiency_pct" in df
+    return {str(name): PumpCurve(str(name), g["flow_m3h"].to_numpy(), g["head_m"].to_numpy(),
+                                 g["efficiency_pct"].to_numpy() if eff else None, method, degree)
+            for name, g in df.groupby("pump", sort=False)}
+
+
+@timed("calc")
+def system_curve(flow_max_m3h, temp_c, press_bar, length_m, material, nps, sch, fitting_len_m=0.0,
+                 elevation_m=0.0, delivery_pressure_bar=0.0, suction_pressure_bar=0.0, points=101):
+    """Required head over 0..``flow_max_m3h`` as a DataFrame (flow_m3h, flow_th, head_m, dp_total, vel, re).
+
+    Each point is calculate_hydraulics at that flow, plus the terminal pressure
+    difference as in required_pump_head.
+    """
+    rho, _ = water_props(temp_c + 273.15, press_bar * 100000)
+    flow_m3h = np.linspace(0.0, flow_max_m3h, points)
+    res = calculate_hydraulics_batch(temp_c=temp_c, flow_th=flow_m3h * rho / 1000, press_bar=press_bar,
+                                     length_m=length_m, fitting_len_m=fitting_len_m, elevation_m=elevation_m,
+                                     pump_eff=100, material=material, nps=nps, sch=sch)
+    if not res["valid"].all():
+        raise ValueError(f"Invalid system: {nps} / Sch {sch} at {temp_c} °C, {press_bar} bar")
+    terminal_m = (delivery_pressure_bar - suction_pressure_bar) * 100000 / (rho * G)
+    return pd.DataFrame({"flow_m3h": flow_m3h, "flow_th": flow_m3h * rho / 1000,
+                         "head_m": res["head_m"].to_numpy() + terminal_m,
+                         "dp_total": res["dp_total"].to_numpy() + terminal_m * rho * G / 100000,
+                         "vel": res["vel"].to_numpy(), "re": res["re"].to_numpy(), "rho": rho})
+
+
+def _system_head(system, q):
+    return np.interp(q, system["flow_m3h"].to_numpy(), system["head_m"].to_numpy(), right=np.nan)
+
+
+def _first_crossing(q, excess):
+    """Per row, linear interpolation of the first + -> <= 0 sign change of ``excess``; NaN if none."""
+    below = np.isfinite(excess) & (excess <= 0)  # NaN = eğri/sistem aralığı dışı
+    i = np.where(below.any(axis=-1), below.argmax(axis=-1), -1)
+    rows = np.arange(q.shape[0])
+    ok = (i > 0) & np.isfinite(excess[rows, np.maximum(i - 1, 0)]) & (excess[rows, np.maximum(i - 1, 0)] > 0)
+    i0 = np.maximum(i - 1, 0)
+    e0, e1 = excess[rows, i0], excess[rows, np.maximum(i, 0)]
+    q0, q1 = q[rows, i0], q[rows, np.maximum(i, 0)]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        root = q0 + (q1 - q0) * e0 / (e0 - e1)
+    return np.where(ok, root, np.nan)
+
+
+def _duty(pump, q, h, rho, speed, parallel):
+    eff = float(pump.efficiency(q, speed, parallel))
+    power_hyd = rho * G * (q / 3600) * h / 1000
+    return {"pump": pump.name, "flow_m3h": q, "flow_th": q * rho / 1000, "head_m": h,
+            "efficiency_pct": eff, "power_hyd": power_hyd,
+            "power_shaft": power_hyd / (eff / 100) if eff > 0 else np.nan,
+            "speed": speed, "parallel": parallel, "series": 1}
+
+
+@timed("calc")
+def operating_point(pump, system, speed=1.0, parallel=1, series=1):
+    """Intersection of the pump arrangement with ``system``; dict or None if they do not meet.
+
+    ``system`` is a system_curve frame; it must extend past the pump's
+    run-out flow (speed * parallel * q_max) for far-right operating points.
+    """
+    from scipy.optimize import brentq
+
+    q_end = min(pump.q_max * speed * parallel, system["flow_m3h"].iloc[-1])
+    q = np.linspace(0.0, q_end, GRID_POINTS)[None, :]
+    excess = pump.head(q, speed, parallel, series) - _system_head(system, q)
+    q_lin = _first_crossing(q, excess)[0]
+    if np.isnan(q_lin):
+        return None
+    step = q_end / (GRID_POINTS - 1)
+    f = lambda x: float(pump.head(x, speed, parallel, series) - _system_head(system, x))
+    lo, hi = max(q_lin - step, 0.0), min(q_lin + step, q_end)
+    q_op = brentq(f, lo, hi, xtol=1e-9 * max(q_end, 1.0)) if f(lo) * f(hi) < 0 else q_lin
+    out = _duty(pump, q_op, float(_system_head(system, q_op)), float(system["rho"].iloc[0]), speed, parallel)
+    out["series"] = series
+    return out
+
+
+@timed("calc")
+def speed_for_flow(pump, system, flow_m3h, parallel=1, series=1, speed_range=(0.3, 1.2)):
+    """VFD speed ratio that puts the operating point at ``flow_m3h``; None if outside ``speed_range``.
+
+    Solves n^2 * H(Q / n) = H_system(Q) for n with Brent's method.
+    """
+    from scipy.optimize import brentq
+
+    h_req = float(_system_head(system, flow_m3h))
+
+    def excess(n):
+        h = float(pump.head(flow_m3h, n, parallel, series))
+        return h - h_req if np.isfinite(h) else -h_req - 1.0  # eğri dışı: hız yetersiz
+
+    lo, hi = speed_range
+    if not np.isfinite(h_req) or excess(hi) < 0 or excess(lo) > 0:
+        return None
+    return brentq(excess, lo, hi, xtol=1e-10)
+
+
+def _head_matrix(pumps, q_unit):
+    """Heads of every pump at flows ``q_unit`` (pumps x grid, per-pump flow at rated speed)."""
+    polys = [p._head_fit for p in pumps]
+    if all(isinstance(c, np.ndarray) for c in polys):
+        coef = np.zeros((len(pumps), max(len(c) for c in polys)))
+        for k, c in enumerate(polys):
+            coef[k, :len(c)] = c
+        h = np.zeros_like(q_unit)
+        for c in coef.T[::-1]:  # Horner, tüm pompalar birlikte
+            h = h * q_unit + c[:, None]
+    else:
+        h = np.vstack([_eval(p._head_fit, np.clip(q_unit[k], 0, p.q_max)) for k, p in enumerate(pumps)])
+    return h
+
+
+@timed("calc")
+def select_pumps(pumps, system, duty_flow_m3h=None, parallel=1, series=1, speed_range=(0.3, 1.0)):
+    """Rank a pump catalogue against ``system``.
+
+    Every pump's full-speed operating point is found in one vectorized pass.
+    With ``duty_flow_m3h`` only pumps that reach it at full speed are kept,
+    each with the VFD speed that hits the duty exactly, sorted by shaft
+    power at duty. Otherwise the list is sorted by efficiency at the operating
+    point.
+    """
+    pumps = list(pumps.values()) if isinstance(pumps, dict) else list(pumps)
+    cols = ["pump", "flow_m3h", "head_m", "efficiency_pct", "power_shaft", "speed"]
+    if not pumps:
+        return pd.DataFrame(columns=cols)
+    rho = float(system["rho"].iloc[0])
+    q_max = np.array([p.q_max for p in pumps])
+    t = np.linspace(0.0, 1.0, GRID_POINTS)
+    q_unit = q_max[:, None] * t  # tek pompa debisi
+    q = q_unit * parallel
+    excess = series * _head_matrix(pumps, q_unit) - _system_head(system, q)
+    excess[q > system["flow_m3h"].iloc[-1]] = np.nan
+    q_op = _first_crossing(q, excess)
+    h_op = _system_head(system, q_op)
+
+    rows = []
+    for k, p in enumerate(pumps):
+        if np.isnan(q_op[k]):
+            continue
+        if duty_flow_m3h is None:
+            rows.append(_duty(p, q_op[k], h_op[k], rho, 1.0, parallel))
+            continue
+        if q_op[k] < duty_flow_m3h:
+            continue
+        n = speed_for_flow(p, system, duty_flow_m3h, parallel, series, speed_range)
+        if n is not None:
+            rows.append(_duty(p, duty_flow_m3h, float(_system_head(system, duty_flow_m3h)), rho, n, parallel))
+    if not rows:
+        return pd.DataFrame(columns=cols)
+    out = pd.DataFrame(rows)
+    out["series"] = series
+    if duty_flow_m3h is None:
+        return out.sort_values("efficiency_pct", ascending=False, ignore_index=True)
+    return out.sort_values("power_shaft", ignore_index=True)
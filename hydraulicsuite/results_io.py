@@ -0,0 +1,111 @@
+"""Streaming result I/O: Parquet writers/readers and chunked CSV export.
+
+Everything here works on iterables of DataFrame chunks, so sweep and history
+exports are encoded one chunk at a time and never hold the full table as
+DataFrames. pyarrow is only needed for the Parquet functions and is imported
+on first use.
+"""
+import io
+import os
+import tempfile
+
+
+def _pa():
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    return pa, pq
+
+
+def write_parquet(frames, path, schema=None, compression="zstd"):
+    """Append DataFrame chunks to ``path`` as Arrow record batches; returns rows written.
+
+    The schema is taken from the first chunk unless given. The file is written
+    to a temporary name and moved into place only when complete.
+    """
+    pa, pq = _pa()
+    tmp = os.path.join(os.path.dirname(os.path.abspath(path)), "_" + os.path.basename(path) + ".tmp")
+    writer = None
+    rows = 0
+    try:
+        for df in frames:
+            batch = pa.RecordBatch.from_pandas(df, schema=schema, preserve_index=False)
+            if writer is None:
+                schema = batch.schema
+                writer = pq.ParquetWriter(tmp, schema, compression=compression)
+            writer.write_batch(batch)
+            rows += batch.num_rows
+        if writer is None:
+            return 0
+        writer.close()
+        writer = None
+        os.replace(tmp, path)
+    finally:
+        if writer is not None:
+            writer.close()
+            os.remove(tmp)
+    return rows
+
+
+def _sources(source):
+    if os.path.isdir(source):
+        return sorted(os.path.join(source, f) for f in os.listdir(source) if f.endswith(".parquet"))
+    return [source]
+
+
+def read_results(source, columns=None, filters=None):
+    """Read a Parquet file or a directory of part files into pandas.
+
+    Only ``columns`` are decoded, and ``filters`` (pyarrow DNF, e.g.
+    ``[("material", "==", "Copper"), ("temp_c", "<", 100)]``) are pushed down
+    so row groups that cannot match are skipped.
+    """
+    import pyarrow.dataset as ds
+    _, pq = _pa()
+    files = _sources(source)
+    if not files:
+        import pandas as pd
+        return pd.DataFrame(columns=columns)
+    dataset = ds.dataset(files, format="parquet")
+    expr = pq.filters_to_expression(filters) if filters else None
+    return dataset.to_table(columns=columns, filter=expr).to_pandas()
+
+
+def iter_csv(frames):
+    """Yield UTF-8 CSV bytes chunk by chunk; the header is written once."""
+    header = True
+    for df in frames:
+        buf = io.StringIO()
+        df.to_csv(buf, index=False, header=header)
+        header = False
+        yield buf.getvalue().encode("utf-8")
+
+
+def _spool(write, suffix):
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    try:
+        write(path)
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+def spool_csv(frames):
+    """Encode CSV chunks through a temp file and return the file's bytes.
+
+    Meant for a deferred ``st.download_button`` callable. The export is only
+    built when the button is clicked, and only one chunk is encoded at a
+    time. The finished file is still returned whole, because Streamlit
+    reads the download into memory anyway.
+    """
+    def write(path):
+        with open(path, "wb") as f:
+            for part in iter_csv(frames):
+                f.write(part)
+    return _spool(write, ".csv")
+
+
+def spool_parquet(frames):
+    """Write chunks to a temporary Parquet file and return its bytes (see spool_csv)."""
+    return _spool(lambda path: write_parquet(frames, path), ".parquet")
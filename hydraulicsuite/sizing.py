@@ -0,0 +1,156 @@
+"""Inverse problems: line sizing, maximum flow and required pump head.
+
+These search with bracketing instead of enumerating every case:
+
+* size_line: pressure drop and velocity depend on the pipe only through its
+  ID and both fall as the ID grows, so the smallest acceptable ID is found by
+  bisection over the sorted candidate IDs (about log2(n) hydraulic
+  evaluations). The B31.3 wall check needs no property calls and is applied
+  as a filter, and the cheapest remaining pipe (catalogue steel mass per
+  metre by default) wins. Fittings are given as a total Le/D, so their
+  equivalent length follows each candidate's ID.
+* max_flow: pressure drop rises with flow, so the limit is bracketed by
+  doubling and then solved with Brent's method.
+* required_pump_head: a single forward evaluation plus the terminal
+  pressure difference.
+"""
+from .asme import required_wall_thickness
+from .data import asme_material_data, pipe_database
+from .hydraulics import calculate_hydraulics
+from .instrument import timed
+
+
+def steel_mass(row):
+    """Default cost: plain-end steel mass per metre from the catalogue row."""
+    return row["mass_kg_m"]
+
+
+def _candidates(design_pres_bar=None, asme_material=None, cost=steel_mass):
+    S_MPa = asme_material_data.get(asme_material, 0) if asme_material else 0
+    out = []
+    for nps, schedules in pipe_database.items():
+        for sch, d in schedules.items():
+            if S_MPa > 0 and design_pres_bar is not None:
+                if d["WT"] < required_wall_thickness(design_pres_bar, d["OD"], S_MPa):
+                    continue
+            out.append((d["ID"], cost(d), nps, sch))
+    return out
+
+
+@timed("calc")
+def size_line(flow_th, temp_c, press_bar, length_m, material, max_dp_bar=None, max_vel=None,
+              fitting_len_m=0.0, fitting_led=0.0, elevation_m=0.0, pump_eff=75.0,
+              design_pres_bar=None, asme_material=None, cost=steel_mass,
+              fluid="Water", quality=None, two_phase_model="homogeneous"):
+    """Cheapest NPS/schedule meeting ``max_dp_bar`` (total) and ``max_vel``, and, when
+    ``asme_material`` is given, the B31.3 wall thickness at ``design_pres_bar``
+    (defaults to ``press_bar``). ``fluid``/``quality``/``two_phase_model`` are
+    passed to calculate_hydraulics.
+
+    ``fitting_led`` is the fittings' total Le/D (sum of qty x Le/D from
+    fitting_led_database); each candidate gets ``fitting_led * ID`` on top of
+    the fixed ``fitting_len_m``. ``cost(row)`` ranks the catalogue rows.
+
+    Returns the calculate_hydraulics result plus nps, sch, cost and
+    evaluations, or None if nothing in the catalogue qualifies.
+    """
+    if design_pres_bar is None:
+        design_pres_bar = press_bar
+    cands = _candidates(design_pres_bar, asme_material, cost)
+    if not cands:
+        return None
+    ids = sorted({c[0] for c in cands})
+    evaluations = 0
+    by_id = {}
+
+    def evaluate(ID_mm, nps, sch):
+        nonlocal evaluations
+        evaluations += 1
+        return calculate_hydraulics(temp_c, flow_th, press_bar, length_m, fitting_len_m + fitting_led * ID_mm / 1000,
+                                    elevation_m, pump_eff, material, nps, sch, fluid, quality, two_phase_model)
+
+    def ok(ID_mm):
+        nps, sch = next((c[2], c[3]) for c in cands if c[0] == ID_mm)
+        res = evaluate(ID_mm, nps, sch)
+        by_id[ID_mm] = res
+        if res is None:
+            return False
+        return ((max_dp_bar is None or res["dp_total"] <= max_dp_bar)
+                and (max_vel is None or res["vel"] <= max_vel))
+
+    # Kabul edilen en küçük ID'yi ikiye bölerek bul
+    if not ok(ids[-1]):
+        return None
+    lo, hi = -1, len(ids) - 1
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if ok(ids[mid]):
+            hi = mid
+        else:
+            lo = mid
+    min_id = ids[hi]
+
+    ID_mm, c, nps, sch = min((x for x in cands if x[0] >= min_id), key=lambda x: (x[1], x[0]))
+    res = by_id.get(ID_mm)
+    if res is None:
+        res = evaluate(ID_mm, nps, sch)
+    return dict(res, nps=nps, sch=sch, cost=c, evaluations=evaluations)
+
+
+@timed("calc")
+def max_flow(allowed_dp_bar, temp_c, press_bar, length_m, material, nps, sch,
+             fitting_len_m=0.0, elevation_m=0.0, flow_guess_th=10.0, rtol=1e-6, max_doublings=60):
+    """Largest mass flow [t/h] whose total pressure drop stays within ``allowed_dp_bar``.
+
+    Returns (flow_th, evaluations); flow is 0.0 when the static head alone
+    exceeds the allowance and None for an invalid pipe/state.
+    """
+    from scipy.optimize import brentq
+
+    evaluations = 0
+
+    def excess(flow):
+        nonlocal evaluations
+        evaluations += 1
+        res = calculate_hydraulics(temp_c, flow, press_bar, length_m, fitting_len_m, elevation_m,
+                                   75, material, nps, sch)
+        if res is None:
+            raise ValueError("invalid case")
+        return res["dp_total"] - allowed_dp_bar
+
+    try:
+        if excess(0.0) > 0:
+            return 0.0, evaluations
+        lo, hi = 0.0, flow_guess_th
+        for _ in range(max_doublings):
+            if excess(hi) >= 0:
+                break
+            lo, hi = hi, hi * 2
+        else:
+            return None, evaluations
+        flow = brentq(excess, lo, hi, rtol=rtol)
+    except ValueError:
+        return None, evaluations
+    return flow, evaluations
+
+
+@timed("calc")
+def required_pump_head(flow_th, temp_c, press_bar, length_m, material, nps, sch,
+                       fitting_len_m=0.0, elevation_m=0.0, pump_eff=75.0,
+                       delivery_pressure_bar=0.0, suction_pressure_bar=0.0):
+    """Pump head [m] for a target flow: friction + static + terminal pressure difference.
+
+    Returns the calculate_hydraulics result with head_m / power_hyd /
+    power_shaft updated for the pressure terms, or None for an invalid case.
+    """
+    res = calculate_hydraulics(temp_c, flow_th, press_bar, length_m, fitting_len_m, elevation_m,
+                               pump_eff, material, nps, sch)
+    if res is None:
+        return None
+    g = 9.81
+    dP_terminal_Pa = (delivery_pressure_bar - suction_pressure_bar) * 100000
+    head_m = res["head_m"] + dP_terminal_Pa / (res["rho"] * g)
+    power_hyd = (flow_th / (res["rho"] / 1000)) * head_m * res["rho"] * g / (3.6 * 1e6)
+    eff_factor = pump_eff / 100.0 if pump_eff > 0 else 0.01
+    return dict(res, head_m=head_m, dp_total=res["dp_total"] + dP_terminal_Pa / 100000,
+                power_hyd=power_hyd, power_shaft=power_hyd / eff_factor)
@@ -0,0 +1,176 @@
+"""Multi-process parameter sweeps over calculate_hydraulics_batch.
+
+A sweep is described by a plain, JSON-serialisable spec (see make_sweep_spec):
+every (NPS, schedule) pair x material x flow x temperature, with the other
+inputs held fixed. Cases are numbered in C order over those axes and never
+materialised up front; each chunk of ``chunk_size`` case ids is expanded,
+computed and written by a worker process.
+
+Every finished chunk is written to ``out_dir/chunk_NNNNNN.parquet`` as Arrow
+record batches (atomically, via a temp file), so the directory is a Parquet
+dataset that load_sweep / results_io.read_results can slice by column and
+predicate. The spec is kept in ``out_dir/sweep.json``. Re-running
+the same spec into the same directory skips the chunks already on disk, so a
+crashed overnight study resumes where it stopped.
+
+    python -m hydraulicsuite.sweep OUT_DIR --flows 10:500:50 --temps 20:180:9
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+import pandas as pd
+
+from .batch import calculate_hydraulics_batch
+from .data import material_list_roughness, pipe_database
+from .results_io import read_results, write_parquet
+
+SPEC_FILE = "sweep.json"
+CHUNK_PATTERN = "chunk_{:06d}.parquet"
+AXES = ["pipe", "material", "flow_th", "temp_c"]
+
+
+def make_sweep_spec(flows, temps, nps=None, schedules=None, materials=None,
+                    press_bar=10.0, length_m=100.0, fitting_len_m=0.0, elevation_m=0.0, pump_eff=75.0,
+                    chunk_size=100_000):
+    """Build a sweep spec; ``nps``/``schedules``/``materials`` default to everything in the tables."""
+    nps = list(pipe_database) if nps is None else list(nps)
+    pipes = [[size, s] for size in nps for s in pipe_database[size]
+             if schedules is None or s in schedules]
+    return {
+        "pipe": pipes,
+        "material": list(material_list_roughness) if materials is None else list(materials),
+        "flow_th": [float(x) for x in np.atleast_1d(flows)],
+        "temp_c": [float(x) for x in np.atleast_1d(temps)],
+        "fixed": {"press_bar": press_bar, "length_m": length_m, "fitting_len_m": fitting_len_m,
+                  "elevation_m": elevation_m, "pump_eff": pump_eff},
+        "chunk_size": int(chunk_size),
+    }
+
+
+def sweep_size(spec):
+    return int(np.prod([len(spec[a]) for a in AXES]))
+
+
+def sweep_chunks(spec):
+    n, size = sweep_size(spec), spec["chunk_size"]
+    return [(i, start, min(start + size, n)) for i, start in enumerate(range(0, n, size))]
+
+
+def expand_cases(spec, start, stop):
+    """Input DataFrame for case ids [start, stop)."""
+    case_id = np.arange(start, stop)
+    ip, im, iq, it = np.unravel_index(case_id, [len(spec[a]) for a in AXES])
+    pipes = np.array(spec["pipe"], dtype=object).reshape(-1, 2)
+    cases = pd.DataFrame({
+        "case_id": case_id,
+        "nps": pipes[ip, 0],
+        "sch": pipes[ip, 1],
+        "material": np.array(spec["material"], dtype=object)[im],
+        "flow_th": np.asarray(spec["flow_th"])[iq],
+        "temp_c": np.asarray(spec["temp_c"])[it],
+    })
+    for k, v in spec["fixed"].items():
+        cases[k] = v
+    return cases
+
+
+def run_chunk(spec, start, stop):
+    cases = expand_cases(spec, start, stop)
+    res = calculate_hydraulics_batch(cases)
+    return pd.concat([cases, res], axis=1)
+
+
+def _run_and_store(spec, index, start, stop, out_dir, batch_rows=20_000):
+    df = run_chunk(spec, start, stop)
+    path = os.path.join(out_dir, CHUNK_PATTERN.format(index))
+    rows = write_parquet((df.iloc[i:i + batch_rows] for i in range(0, len(df), batch_rows)), path)
+    return index, rows
+
+
+def _prepare_dir(spec, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    spec_path = os.path.join(out_dir, SPEC_FILE)
+    if os.path.exists(spec_path):
+        with open(spec_path, encoding="utf-8") as f:
+            if json.load(f) != json.loads(json.dumps(spec)):
+                raise ValueError(f"{out_dir} holds a different sweep; use a new directory")
+    else:
+        with open(spec_path, "w", encoding="utf-8") as f:
+            json.dump(spec, f)
+
+
+def pending_chunks(spec, out_dir):
+    return [c for c in sweep_chunks(spec)
+            if not os.path.exists(os.path.join(out_dir, CHUNK_PATTERN.format(c[0])))]
+
+
+def run_sweep(spec, out_dir, max_workers=None, progress=None):
+    """Run (or resume) a sweep; returns the number of chunks computed in this call.
+
+    ``progress(done, total)`` is called after each chunk lands on disk. At most
+    two chunks per worker are in flight, so memory stays bounded for any grid size.
+    """
+    _prepare_dir(spec, out_dir)
+    total = len(sweep_chunks(spec))
+    todo = pending_chunks(spec, out_dir)
+    done = total - len(todo)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        queue = iter(todo)
+        running = set()
+        while True:
+            for index, start, stop in queue:
+                running.add(pool.submit(_run_and_store, spec, index, start, stop, out_dir))
+                if len(running) >= 2 * max_workers:
+                    break
+            if not running:
+                break
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                fut.result()
+                done += 1
+                if progress:
+                    progress(done, total)
+    return len(todo)
+
+
+def load_sweep(out_dir, columns=None, filters=None):
+    """Read the chunks written so far (in case-id order), projected to ``columns``
+    and filtered with pyarrow DNF ``filters`` before decoding."""
+    return read_results(out_dir, columns=columns, filters=filters)
+
+
+def _axis_arg(text):
+    """'a:b:n' -> linspace(a, b, n); 'a,b,c' -> list."""
+    if ":" in text:
+        a, b, n = text.split(":")
+        return np.linspace(float(a), float(b), int(n))
+    return [float(x) for x in text.split(",")]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run a resumable hydraulics sweep.")
+    ap.add_argument("out_dir")
+    ap.add_argument("--flows", type=_axis_arg, required=True, help="t/h, 'start:stop:n' or 'a,b,c'")
+    ap.add_argument("--temps", type=_axis_arg, required=True, help="°C, 'start:stop:n' or 'a,b,c'")
+    ap.add_argument("--nps", nargs="*")
+    ap.add_argument("--schedules", nargs="*")
+    ap.add_argument("--materials", nargs="*")
+    ap.add_argument("--pressure", type=float, default=10.0, help="bar")
+    ap.add_argument("--length", type=float, default=100.0, help="m")
+    ap.add_argument("--chunk-size", type=int, default=100_000)
+    ap.add_argument("--workers", type=int)
+    args = ap.parse_args(argv)
+
+    spec = make_sweep_spec(args.flows, args.temps, args.nps, args.schedules, args.materials,
+                           press_bar=args.pressure, length_m=args.length, chunk_size=args.chunk_size)
+    print(f"{sweep_size(spec):,} cases in {len(sweep_chunks(spec))} chunks -> {args.out_dir}")
+    run_sweep(spec, args.out_dir, args.workers, progress=lambda d, t: print(f"  {d}/{t} chunks", flush=True))
+
+
+if __name__ == "__main__":
+    main()
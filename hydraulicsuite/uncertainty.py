@@ -0,0 +1,194 @@
+"""Monte Carlo uncertainty analysis over calculate_hydraulics_batch.
+
+A study is a plain, JSON-serialisable spec (see make_uncertainty_spec), like
+a sweep. It holds nominal line inputs plus a distribution for each uncertain
+one:
+
+    ("fixed", value)            ("uniform", low, high)
+    ("normal", mean, sd)        ("triangular", low, mode, high)
+    ("lognormal", median, sigma)
+
+``roughness_mm`` can be sampled directly (ageing from new to corroded
+steel); otherwise roughness comes from ``material``.
+
+Cases are drawn and evaluated ``chunk_size`` at a time, so intermediate
+memory is bounded by the chunk. Only the uncertain inputs and OUTPUTS are
+kept, as float32 (1M cases x 8 columns ~ 32 MB). Chunk ``i`` always samples
+from ``default_rng([seed, i])``, so a result depends only on the spec: not
+on the chunk order or on how many worker processes ran it.
+
+The result has percentiles of each output and a tornado table. For each
+input, the tornado table holds the swing in dp_total (or another output)
+between its 5th and 95th percentile with every other input at its median,
+plus the Spearman rank correlation over the samples.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+import pandas as pd
+
+from .batch import calculate_hydraulics_batch
+from .instrument import timed
+
+DISTRIBUTIONS = ("fixed", "uniform", "normal", "triangular", "lognormal")
+UNCERTAIN_INPUTS = ["flow_th", "temp_c", "press_bar", "length_m", "fitting_len_m", "elevation_m", "pump_eff",
+                    "roughness_mm"]
+NONNEGATIVE = {"flow_th", "length_m", "fitting_len_m", "roughness_mm"}
+OUTPUTS = ["dp_total", "dp_friction", "power_shaft", "vel"]
+PERCENTILES = (5, 10, 50, 90, 95)
+TORNADO_RANGE = (5, 95)
+
+
+def make_uncertainty_spec(nominal, distributions, n=100_000, seed=0, fluid="Water", chunk_size=100_000):
+    """Build a study spec.
+
+    ``nominal`` holds every batch input (temp_c, flow_th, press_bar, length_m,
+    fitting_len_m, elevation_m, pump_eff, material, nps, sch); ``distributions``
+    maps any of UNCERTAIN_INPUTS to a distribution tuple.
+    """
+    for name, dist in distributions.items():
+        if name not in UNCERTAIN_INPUTS:
+            raise ValueError(f"{name!r} cannot be sampled; use one of {UNCERTAIN_INPUTS}")
+        if not dist or dist[0] not in DISTRIBUTIONS:
+            raise ValueError(f"{name}: distribution must be one of {DISTRIBUTIONS}")
+    return {
+        "nominal": dict(nominal),
+        "distributions": {k: [dist[0], *map(float, dist[1:])] for k, dist in distributions.items()},
+        "n": int(n), "seed": int(seed), "fluid": fluid, "chunk_size": int(chunk_size),
+    }
+
+
+def _draw(rng, dist, size):
+    kind, *a = dist
+    if kind == "fixed":
+        return np.full(size, a[0])
+    if kind == "uniform":
+        return rng.uniform(a[0], a[1], size)
+    if kind == "normal":
+        return rng.normal(a[0], a[1], size)
+    if kind == "triangular":
+        return rng.triangular(a[0], a[1], a[2], size)
+    return a[0] * np.exp(rng.normal(0.0, a[1], size))  # lognormal: medyan, sigma
+
+
+def sample_chunk(spec, index, start, stop):
+    """Sampled inputs for case ids [start, stop) of chunk ``index`` (dict of arrays)."""
+    rng = np.random.default_rng([spec["seed"], index])
+    out = {}
+    for name in sorted(spec["distributions"]):  # sabit sıra: aynı tohum -> aynı örnekler
+        x = _draw(rng, spec["distributions"][name], stop - start)
+        out[name] = np.maximum(x, 0.0) if name in NONNEGATIVE else x
+    return out
+
+
+def run_chunk(spec, index, start, stop):
+    """Evaluate one chunk; returns float32 arrays of the sampled inputs, OUTPUTS and ``valid``."""
+    sampled = sample_chunk(spec, index, start, stop)
+    res = calculate_hydraulics_batch(fluid=spec["fluid"], **{**spec["nominal"], **sampled})
+    out = {k: v.astype(np.float32) for k, v in sampled.items()}
+    out.update({k: res[k].to_numpy(dtype=np.float32) for k in OUTPUTS})
+    out["valid"] = res["valid"].to_numpy()
+    return index, out
+
+
+def _chunks(spec):
+    n, size = spec["n"], spec["chunk_size"]
+    return [(i, start, min(start + size, n)) for i, start in enumerate(range(0, n, size))]
+
+
+def run_samples(spec, max_workers=1, progress=None):
+    """All cases of ``spec`` as a DataFrame in case order (inputs + OUTPUTS + valid).
+
+    ``max_workers`` > 1 spreads chunks over processes, with at most two chunks per
+    worker in flight. ``progress(done, total)`` is called per finished chunk.
+    """
+    chunks = _chunks(spec)
+    parts = {}
+    if max_workers == 1:
+        for c in chunks:
+            i, parts[i] = run_chunk(spec, *c)
+            if progress:
+                progress(len(parts), len(chunks))
+    else:
+        max_workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            queue = iter(chunks)
+            running = set()
+            while True:
+                for c in queue:
+                    running.add(pool.submit(run_chunk, spec, *c))
+                    if len(running) >= 2 * max_workers:
+                        break
+                if not running:
+                    break
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    i, parts[i] = fut.result()
+                    if progress:
+                        progress(len(parts), len(chunks))
+    return pd.DataFrame({k: np.concatenate([parts[i][k] for i in sorted(parts)]) for k in parts[0]})
+
+
+def percentile_table(samples, outputs=OUTPUTS, q=PERCENTILES):
+    """Mean, sd and percentiles of each output over the valid samples (one row per output; NaN if none)."""
+    valid = samples[samples["valid"]]
+    rows = {}
+    for k in outputs:
+        x = valid[k].to_numpy(dtype=float)
+        stats = (x.mean(), x.std(), *np.percentile(x, q)) if len(x) else (np.nan,) * (2 + len(q))
+        rows[k] = dict(zip(["mean", "sd", *(f"p{p:g}" for p in q)], stats))
+    return pd.DataFrame(rows).T
+
+
+def _ranks(x):
+    r = np.empty(len(x))
+    r[np.argsort(x, kind="stable")] = np.arange(len(x))
+    return r
+
+
+def tornado(spec, samples, output="dp_total", q=TORNADO_RANGE):
+    """One-at-a-time swings of ``output`` over each sampled input, largest first.
+
+    Columns: input, low, high (input values at the q percentiles), out_low,
+    out_high, swing = |out_high - out_low|, spearman (rank correlation).
+    """
+    valid = samples[samples["valid"]]
+    names = [k for k in sorted(spec["distributions"]) if spec["distributions"][k][0] != "fixed"]
+    if not names or valid.empty:
+        return pd.DataFrame(columns=["input", "low", "high", "out_low", "out_high", "swing", "spearman"])
+    base = {k: float(np.median(valid[k])) for k in names}
+    bounds = {k: np.percentile(valid[k].to_numpy(dtype=float), q) for k in names}
+    # Tek batch çağrısı: her girdi için alt/üst durum, diğerleri medyanda
+    cases = pd.DataFrame([{**base, k: bounds[k][j]} for k in names for j in (0, 1)])
+    res = calculate_hydraulics_batch(fluid=spec["fluid"], **{**spec["nominal"], **cases.to_dict("series")})
+    y = res[output].to_numpy().reshape(-1, 2)
+    out_rank = _ranks(valid[output].to_numpy(dtype=float))
+    table = pd.DataFrame({
+        "input": names,
+        "low": [bounds[k][0] for k in names], "high": [bounds[k][1] for k in names],
+        "out_low": y[:, 0], "out_high": y[:, 1], "swing": np.abs(y[:, 1] - y[:, 0]),
+        "spearman": [np.corrcoef(_ranks(valid[k].to_numpy(dtype=float)), out_rank)[0, 1] for k in names],
+    })
+    return table.sort_values("swing", ascending=False, ignore_index=True)
+
+
+@timed("calc")
+def run_uncertainty(spec, max_workers=1, progress=None, output="dp_total"):
+    """Run a study; returns dict samples, percentiles, tornado, n, n_valid.
+
+    Raises ValueError if no sampled case could be evaluated (unknown pipe,
+    or every state outside the property range).
+    """
+    samples = run_samples(spec, max_workers, progress)
+    if not samples["valid"].any():
+        nom = spec["nominal"]
+        raise ValueError(f"None of the {len(samples):,} cases could be evaluated; check the pipe "
+                         f"({nom.get('nps')} Sch {nom.get('sch')}) and that the sampled states are single-phase "
+                         f"{spec['fluid']} within the property range")
+    return {
+        "samples": samples,
+        "percentiles": percentile_table(samples),
+        "tornado": tornado(spec, samples, output),
+        "n": len(samples), "n_valid": int(samples["valid"].sum()),
+    }
@@ -0,0 +1,88 @@
+"""Shared fixtures for the golden-value and benchmark suites.
+
+Benchmarks run through the ``perf`` fixture, which times the call with
+pytest-benchmark. A plain ``pytest`` run only reports the timings, so its
+result does not depend on machine load. The regression gate is opt-in:
+
+    python -m pytest tests --perf-check
+
+fails a benchmark whose best round (per call) is more than PERF_TOLERANCE
+times the one stored for it in benchmarks/baseline.json. The minimum is
+used because scheduler noise only ever adds time. Sub-microsecond calls
+are batched (``iterations``) so that one round is well above timer
+resolution. To refresh the baseline on the reference machine after an
+intended change:
+
+    python -m pytest tests --perf-update
+
+HYDRAULICSUITE_PERF_TOLERANCE loosens the limit on slower machines.
+``--benchmark-disable`` runs every benchmark once, as a plain test.
+"""
+import json
+import os
+import platform
+
+import pytest
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "baseline.json")
+PERF_TOLERANCE = float(os.environ.get("HYDRAULICSUITE_PERF_TOLERANCE", 2.0))
+
+
+def pytest_addoption(parser):
+    parser.addoption("--perf-check", action="store_true", help="fail benchmarks slower than the committed baseline")
+    parser.addoption("--perf-update", action="store_true", help="rewrite benchmarks/baseline.json from this run")
+
+
+@pytest.fixture(scope="session")
+def perf_baseline(request):
+    try:
+        with open(BASELINE_FILE, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = {"machine": None}
+    data.setdefault("min_s", {})
+    yield data
+    if request.config.getoption("--perf-update"):
+        data["machine"] = f"{platform.machine()} {platform.python_implementation()} {platform.python_version()}"
+        data["min_s"] = dict(sorted(data["min_s"].items()))
+        data.pop("median_s", None)
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+            f.write("\n")
+
+
+@pytest.fixture
+def perf(benchmark, perf_baseline, request):
+    """``perf(fn, *args, rounds=None, iterations=None)``: benchmark ``fn``; with --perf-check, gate it.
+
+    ``rounds`` switches to pedantic mode (one warm-up, then ``rounds`` rounds)
+    for cases too slow for pytest-benchmark's calibration. ``iterations``
+    calls ``fn`` that many times per round (default 100 rounds), for
+    sub-microsecond cases; times are still per call.
+    """
+    name = request.node.name
+    config = request.config
+
+    def run(fn, *args, rounds=None, iterations=None, **kwargs):
+        if rounds or iterations:
+            result = benchmark.pedantic(fn, args, kwargs, rounds=rounds or 100, iterations=iterations or 1,
+                                        warmup_rounds=1)
+        else:
+            result = benchmark(fn, *args, **kwargs)
+        if benchmark.stats is None:  # --benchmark-disable
+            return result
+        best = benchmark.stats.stats.min
+        if config.getoption("--perf-update"):
+            perf_baseline["min_s"][name] = best
+            return result
+        if not config.getoption("--perf-check"):
+            return result
+        ref = perf_baseline["min_s"].get(name)
+        if ref is None:
+            pytest.fail(f"{name}: no baseline in benchmarks/baseline.json; run with --perf-update")
+        if best > PERF_TOLERANCE * ref:
+            pytest.fail(f"{name}: best {best * 1e6:.2f} µs is over {PERF_TOLERANCE:g}x "
+                        f"the baseline {ref * 1e6:.2f} µs")
+        return result
+
+    return run
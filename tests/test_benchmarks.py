@@ -0,0 +1,112 @@
+"""Throughput benchmarks for the hot path; ``--perf-check`` gates them on benchmarks/baseline.json.
+
+Everything runs offline: properties come from the bundled grid / CoolProp,
+SQLite writes to a temporary file.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from hydraulicsuite import (
+    NPS_SIZES, calculate_hydraulics, calculate_hydraulics_batch, check_wall_thickness, default_schedule, get_ID,
+    march_line, material_list_roughness, simulate_transient, water_props, water_props_array,
+)
+from hydraulicsuite.fluids import coolprop_backend
+from hydraulicsuite.persistence import PROJECT_COLUMNS, ProjectStore
+
+LINE = (120, 100, 40, 1000, 25, 15, 75, "Carbon Steel (New)", "4 inch", "40")
+
+
+def random_cases(n, seed=0):
+    rng = np.random.default_rng(seed)
+    sizes = np.array(NPS_SIZES, dtype=object)[rng.integers(0, len(NPS_SIZES), n)]
+    return pd.DataFrame({
+        "temp_c": rng.uniform(5, 180, n), "flow_th": rng.uniform(1, 500, n), "press_bar": rng.uniform(10, 60, n),
+        "length_m": 100.0, "fitting_len_m": 0.0, "elevation_m": rng.uniform(-20, 20, n), "pump_eff": 75.0,
+        "material": np.array(list(material_list_roughness), dtype=object)[rng.integers(0, 7, n)],
+        "nps": sizes, "sch": [default_schedule(s) for s in sizes],
+    })
+
+
+# --- TEK DURUM GECİKMESİ ---
+def test_single_case(perf):
+    calculate_hydraulics(*LINE)  # özellik önbelleği ısınır
+    assert perf(calculate_hydraulics, *LINE, iterations=100)["dp_total"] > 0
+
+
+def test_get_id(perf):
+    assert perf(get_ID, "4 inch", "40", iterations=1000) > 0
+
+
+def test_wall_thickness(perf):
+    assert perf(check_wall_thickness, "A106 Grade B", "4 inch", "40", 40, iterations=1000)["safe"]
+
+
+# --- TOPLU TARAMALAR ---
+@pytest.mark.parametrize("n", [1_000, 100_000])
+def test_batch_sweep(perf, n):
+    cases = random_cases(n)
+    res = perf(calculate_hydraulics_batch, cases, rounds=None if n <= 1_000 else 5)
+    assert res["valid"].mean() > 0.95
+
+
+def test_simulation_table(perf):
+    # Analytics > Live Simulation: tüm NPS boyutları, tek batch çağrısı
+    schs = [default_schedule(s) for s in NPS_SIZES]
+    res = perf(calculate_hydraulics_batch, temp_c=120, flow_th=100, press_bar=40, length_m=1000, fitting_len_m=0,
+               elevation_m=0, pump_eff=75, material="Carbon Steel (New)", nps=NPS_SIZES, sch=schs)
+    assert res["valid"].any()
+
+
+def test_march_1000_segments(perf):
+    r = perf(march_line, *LINE, n_segments=1000, adaptive=False)
+    assert r["segments"] == 1000
+
+
+def test_transient_500_reaches(perf):
+    r = perf(simulate_transient, 100, 20, 10, 1000, "Carbon Steel (New)", "4 inch", "40", "A106 Grade B",
+             t_close=2.0, n_reaches=500, rounds=3)
+    assert r["max_pressure_bar"] > 10
+
+
+# --- ÖZELLİK SORGULARI ---
+def test_props_cached(perf):
+    water_props(393.15, 40e5)
+    assert perf(water_props, 393.15, 40e5, iterations=1000)[0] > 900
+
+
+def test_props_coolprop_state(perf):
+    backend = coolprop_backend("Water")
+    assert perf(backend.props, 393.15, 40e5, iterations=100)[0] > 900
+
+
+def test_props_array_100k(perf):
+    rng = np.random.default_rng(1)
+    T, P = rng.uniform(280, 450, 100_000), rng.uniform(5e5, 60e5, 100_000)
+    rho, _ = perf(water_props_array, T, P, rounds=5)
+    assert np.isfinite(rho).all()
+
+
+# --- SQLITE ---
+@pytest.fixture
+def store(tmp_path):
+    s = ProjectStore(str(tmp_path / "bench.db"))
+    yield s
+    s.close()
+
+
+def test_sqlite_insert_one(perf, store):
+    assert perf(store.insert_project, "bench", "Carbon Steel (New)", "4 inch", "40", 1.2, 2.5) > 0
+
+
+def test_sqlite_insert_many_10k(perf, store):
+    rows = [("bench", "Carbon Steel (New)", "4 inch", "40", 1.2, 2.5, None)] * 10_000
+    assert len(rows[0]) == len(PROJECT_COLUMNS)
+    assert perf(store.insert_many, rows, rounds=5) == 10_000
+
+
+def test_sqlite_query(perf, store):
+    rows = ((f"line-{i}", "Carbon Steel (New)", "4 inch", "40", i * 0.01, 2.5, None) for i in range(20_000))
+    store.insert_many(rows)
+    total, page = perf(lambda: (store.count_projects("line"), store.page_projects("carbon", limit=50)))
+    assert total == 20_000 and len(page) == 50
@@ -0,0 +1,81 @@
+"""Property backends: lazy CoolProp loading and the water grid in front of it."""
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from hydraulicsuite import calculate_hydraulics, calculate_hydraulics_batch
+from hydraulicsuite.fluids import PropertyError, WaterBackend, coolprop_backend, get_backend
+
+LINE = (120, 100, 40, 1000, 25, 15, 75, "Carbon Steel (New)", "4 inch", "40")
+
+
+def run_fresh(code):
+    # Temiz süreç: pytest oturumunda CoolProp zaten yüklü olabilir
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return out.stdout.strip()
+
+
+def test_in_grid_calculations_do_not_import_coolprop():
+    code = f"""
+import sys
+from hydraulicsuite import calculate_hydraulics, calculate_hydraulics_batch
+assert calculate_hydraulics(*{LINE!r})["dp_total"] > 0
+assert "CoolProp" not in sys.modules, "scalar"
+res = calculate_hydraulics_batch(temp_c=[20, 80, 120], flow_th=100, press_bar=40, length_m=1000, fitting_len_m=0,
+                                 elevation_m=0, pump_eff=75, material="Carbon Steel (New)", nps="4 inch", sch="40")
+assert res["valid"].all()
+print("CoolProp" in sys.modules)
+"""
+    assert run_fresh(code) == "False"
+
+
+def test_grid_miss_loads_coolprop():
+    code = """
+import sys
+from hydraulicsuite.fluids import get_backend
+rho, mu, phase = get_backend("Water").state(300 + 273.15, 10e5)
+print("CoolProp" in sys.modules, phase)
+"""
+    assert run_fresh(code) == "True gas"
+
+
+def test_water_backend_matches_coolprop():
+    water = get_backend("Water")
+    assert isinstance(water, WaterBackend)
+    rho, mu, phase = water.state(393.15, 40e5)
+    ref_rho, ref_mu = coolprop_backend("Water").props(393.15, 40e5)
+    assert phase == "liquid"
+    assert rho == pytest.approx(ref_rho, rel=1e-5)
+    assert mu == pytest.approx(ref_mu, rel=1e-3)
+    assert water.saturation(10e5)["T_sat"] == pytest.approx(453.03, abs=0.05)
+    assert water.vapour_pressure(373.15) == pytest.approx(101418, rel=1e-4)
+    assert water.speed_sound(300, 10e5) == pytest.approx(1503.04, rel=1e-5)
+
+
+def test_saturation_state_is_rejected():
+    t_sat_c = get_backend("Water").saturation(10e5)["T_sat"] - 273.15
+    with pytest.raises(PropertyError, match="saturation"):
+        calculate_hydraulics(t_sat_c, 10, 10, 100, 0, 0, 75, "Carbon Steel (New)", "4 inch", "40")
+    r = calculate_hydraulics(t_sat_c, 10, 10, 100, 0, 0, 75, "Carbon Steel (New)", "4 inch", "40", quality=0.1)
+    assert r["phase"] == "two-phase" and r["dp_friction"] > 0
+
+
+def test_batch_rejects_saturation_like_scalar():
+    t_sat_c = get_backend("Water").saturation(10e5)["T_sat"] - 273.15
+    temps = [t_sat_c - 0.005, t_sat_c + 0.005, t_sat_c - 1, t_sat_c + 1]
+    res = calculate_hydraulics_batch(temp_c=temps, flow_th=10, press_bar=10, length_m=100, fitting_len_m=0,
+                                     elevation_m=0, pump_eff=75, material="Carbon Steel (New)", nps="4 inch", sch="40")
+    assert list(res["valid"]) == [False, False, True, True]
+    assert res["rho"][:2].isna().all()
+    for t, ok in zip(temps, res["valid"]):
+        if ok:
+            assert calculate_hydraulics(t, 10, 10, 100, 0, 0, 75, "Carbon Steel (New)", "4 inch", "40")["rho"] == \
+                pytest.approx(res["rho"][temps.index(t)], rel=1e-6)
+        else:
+            with pytest.raises(PropertyError, match="saturation"):
+                calculate_hydraulics(t, 10, 10, 100, 0, 0, 75, "Carbon Steel (New)", "4 inch", "40")
+    n2 = coolprop_backend("Nitrogen")
+    rho, _ = n2.props_array([n2.saturation(101325.0)["T_sat"], 300.0], 101325.0)
+    assert np.isnan(rho[0]) and rho[1] > 1
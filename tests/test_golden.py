@@ -0,0 +1,115 @@
+"""Golden values for the hydraulics hot path.
+
+Each case is checked two ways. First against the closed-form reference
+(Hagen-Poiseuille, Colebrook, rho*g*dz, ASME B31.3 Eq. 3a, Joukowsky).
+Then against values frozen from the current code, so that a refactor which
+changes any number shows up here.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from hydraulicsuite import (
+    calculate_hydraulics, calculate_hydraulics_batch, check_wall_thickness, get_ID, required_wall_thickness,
+    simulate_transient,
+)
+
+G = 9.81
+REL = 1e-4  # dondurulmuş değerler; CoolProp sürümleri arasında küçük fark payı
+
+# name: (inputs, expected re, f, dp_total [bar])
+CASES = {
+    "laminar": ((20, 0.1, 5, 100, 0, 0, 75, "Stainless Steel", "2 inch", "40"),
+                672.8555, 0.0951170, 0.000149684),
+    "transitional": ((20, 0.45, 5, 100, 0, 0, 75, "Stainless Steel", "2 inch", "40"),
+                     3027.850, 0.0442210, 0.00140919),
+    "turbulent_uphill": ((120, 100, 40, 1000, 25, 15, 75, "Carbon Steel (New)", "4 inch", "40"),
+                         1484110.1, 0.0165934, 11.457218),
+    "turbulent_downhill": ((120, 100, 40, 1000, 25, -15, 75, "Carbon Steel (New)", "4 inch", "40"),
+                           1484110.1, 0.0165934, 8.676087),
+}
+
+
+def colebrook(Re, eps_mm, D_m):
+    f = 0.02
+    for _ in range(50):
+        f = (-2 * math.log10(eps_mm / 1000 / D_m / 3.7 + 2.51 / (Re * math.sqrt(f)))) ** -2
+    return f
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_frozen_values(name):
+    args, re, f, dp = CASES[name]
+    r = calculate_hydraulics(*args)
+    assert r["re"] == pytest.approx(re, rel=REL)
+    assert r["f"] == pytest.approx(f, rel=REL)
+    assert r["dp_total"] == pytest.approx(dp, rel=REL)
+
+
+def test_laminar_matches_hagen_poiseuille():
+    r = calculate_hydraulics(*CASES["laminar"][0])
+    assert r["re"] < 2300
+    assert r["f"] == pytest.approx(64 / r["re"])
+    D = r["id_mm"] / 1000
+    Q = 0.1 * 1000 / 3600 / r["rho"]
+    assert r["dp_friction"] * 1e5 == pytest.approx(128 * r["mu"] * 100 * Q / (math.pi * D**4), rel=1e-9)
+
+
+@pytest.mark.parametrize("name", ["transitional", "turbulent_uphill"])
+def test_turbulent_friction_close_to_colebrook(name):
+    args = CASES[name][0]
+    r = calculate_hydraulics(*args)
+    eps = {"Stainless Steel": 0.0015, "Carbon Steel (New)": 0.045}[args[7]]
+    # Haaland, Colebrook'tan en fazla ~%2 sapar
+    assert r["f"] == pytest.approx(colebrook(r["re"], eps, r["id_mm"] / 1000), rel=0.02)
+
+
+def test_elevation_sign():
+    up = calculate_hydraulics(*CASES["turbulent_uphill"][0])
+    down = calculate_hydraulics(*CASES["turbulent_downhill"][0])
+    assert up["dp_friction"] == pytest.approx(down["dp_friction"])
+    assert up["dp_static"] == pytest.approx(up["rho"] * G * 15 / 1e5)
+    assert down["dp_static"] == pytest.approx(-up["dp_static"])
+    assert up["dp_total"] - down["dp_total"] == pytest.approx(2 * up["dp_static"])
+
+
+def test_batch_matches_scalar():
+    cols = list(zip(*(CASES[k][0] for k in CASES)))
+    keys = ["temp_c", "flow_th", "press_bar", "length_m", "fitting_len_m", "elevation_m", "pump_eff",
+            "material", "nps", "sch"]
+    batch = calculate_hydraulics_batch(**{k: np.array(v) for k, v in zip(keys, cols)})
+    assert batch["valid"].all()
+    for i, name in enumerate(CASES):
+        r = calculate_hydraulics(*CASES[name][0])
+        for k in ("re", "f", "dp_total", "power_shaft"):
+            assert batch[k].iloc[i] == pytest.approx(r[k], rel=1e-6)
+
+
+def test_unknown_pipe_is_none():
+    assert get_ID("4 inch", "XYZ") is None
+    assert calculate_hydraulics(20, 10, 5, 100, 0, 0, 75, "Stainless Steel", "4 inch", "XYZ") is None
+
+
+def test_get_id():
+    assert get_ID("4 inch", "40") == pytest.approx(102.26)
+    assert get_ID("2 inch", "40") == pytest.approx(52.48)
+
+
+def test_wall_thickness_b31_3():
+    # t = P D / 2(S E + P Y) + c = 4 * 114.3 / 2(138 + 1.6) + 1
+    assert required_wall_thickness(40, 114.3, 138) == pytest.approx(4 * 114.3 / 279.2 + 1.0)
+    r = check_wall_thickness("A106 Grade B", "4 inch", "40", 40)
+    assert r["act"] == pytest.approx(6.02)
+    assert r["sf"] == pytest.approx(6.02 / r["req"])
+    assert r["safe"]
+    assert check_wall_thickness("A106 Grade B", "4 inch", "40", 2000)["safe"] is False
+
+
+def test_instant_closure_reaches_joukowsky():
+    r = simulate_transient(100, 20, 10, 1000, "Carbon Steel (New)", "4 inch", "40", "A106 Grade B",
+                           t_close=0.0, n_reaches=200)
+    assert r["wave_speed"] == pytest.approx(1372.83, rel=1e-3)
+    assert r["joukowsky_bar"] == pytest.approx(46.431, rel=1e-3)
+    # Anlık kapanma: P0 + a*rho*v0, eksi yukarı akıştaki sürtünme kaybı
+    assert r["max_pressure_bar"] == pytest.approx(10 + r["joukowsky_bar"], rel=0.01)
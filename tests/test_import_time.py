@@ -0,0 +1,21 @@
+"""Import-time budget of the headless core (benchmarks/import_time.py) as a test."""
+import importlib.util
+import os
+import statistics
+
+BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "import_time.py")
+
+
+def load_benchmark():
+    # benchmarks/ paket değil: betiği dosya yolundan yükle
+    spec = importlib.util.spec_from_file_location("import_time", BENCH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_core_import_within_budget():
+    bench = load_benchmark()
+    samples, loaded = bench.measure(5)
+    assert loaded == []
+    assert statistics.median(samples) < bench.BUDGET_MS
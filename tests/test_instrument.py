@@ -0,0 +1,90 @@
+"""Stage timing: nesting and self time, the "other" remainder and the no-recorder path."""
+import json
+import logging
+import types
+
+import pytest
+
+from hydraulicsuite import instrument
+from hydraulicsuite.instrument import configure_json_log, stage, start_rerun, timed
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Elle ilerletilen saat: süreler milisaniye cinsinden kesin
+    now = [0.0]
+    monkeypatch.setattr(instrument, "time", types.SimpleNamespace(perf_counter=lambda: now[0]))
+
+    def advance(ms):
+        now[0] += ms / 1000
+    return advance
+
+
+def test_nested_stages_split_self_time(clock):
+    @timed("props")
+    def lookup(ms):
+        clock(ms)
+        return "rho"
+
+    @timed("calc", "line")
+    def calc():
+        clock(2)
+        assert lookup(3) == "rho"
+        with stage("db", "save"):
+            clock(1)
+            lookup(4)
+        return 42
+
+    rerun = start_rerun(page="Pressure Drop")
+    clock(5)  # aşama dışı: "other"
+    with stage("chart", "breakdown"):
+        assert calc() == 42
+        clock(6)
+    clock(0.5)
+    summary = rerun.finish()
+
+    rows = {(r["category"], r["name"]): r for r in summary["stages"]}
+    assert rows["props", "test_nested_stages_split_self_time.<locals>.lookup"]["calls"] == 2
+    assert rows["props", "test_nested_stages_split_self_time.<locals>.lookup"]["self_ms"] == pytest.approx(7)
+    assert rows["db", "save"]["total_ms"] == pytest.approx(5) and rows["db", "save"]["self_ms"] == pytest.approx(1)
+    assert rows["calc", "line"]["total_ms"] == pytest.approx(10) and rows["calc", "line"]["self_ms"] == pytest.approx(2)
+    assert rows["chart", "breakdown"]["total_ms"] == pytest.approx(16)
+    assert rows["chart", "breakdown"]["self_ms"] == pytest.approx(6)
+    assert summary["page"] == "Pressure Drop" and summary["total_ms"] == pytest.approx(21.5)
+    assert summary["by_category"] == pytest.approx({"props": 7, "chart": 6, "calc": 2, "db": 1, "other": 5.5})
+    assert [r["self_ms"] for r in summary["stages"]] == sorted((r["self_ms"] for r in summary["stages"]), reverse=True)
+
+
+def test_no_recorder_outside_a_rerun():
+    calls = []
+
+    @timed("calc")
+    def f(x):
+        calls.append(x)
+        return x * 2
+
+    assert instrument._current.get() is None
+    assert f(3) == 6
+    with stage("db", "save"):
+        assert f(4) == 8
+    assert calls == [3, 4]
+    rerun = start_rerun()
+    assert instrument._current.get() is rerun
+    rerun.finish()
+    assert instrument._current.get() is None  # finish() kaydı kapatır
+
+
+def test_json_log(tmp_path, monkeypatch):
+    log = logging.getLogger(instrument.LOGGER_NAME)
+    for attr, value in (("handlers", []), ("level", log.level), ("propagate", log.propagate)):
+        monkeypatch.setattr(log, attr, value)
+    path = tmp_path / "perf.jsonl"
+    configure_json_log(str(path))
+    try:
+        start_rerun(page="Sizing").finish()
+        configure_json_log("-")  # zaten yapılandırılmış: dokunmaz
+        assert len(log.handlers) == 1
+    finally:
+        log.handlers[0].close()
+    line = json.loads(path.read_text(encoding="utf-8"))
+    assert line["event"] == "rerun" and line["page"] == "Sizing" and "other" in line["by_category"]
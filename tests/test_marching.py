@@ -0,0 +1,53 @@
+"""Segmented calculation: single-segment limit, heat loss and adaptive refinement."""
+import math
+
+import numpy as np
+import pytest
+
+from hydraulicsuite import calculate_hydraulics, march_line
+from hydraulicsuite.catalogue import lookup
+from hydraulicsuite.fluids import get_backend
+
+SHORT = (60, 50, 10, 200, 10, 0, 75, "Carbon Steel (New)", "4 inch", "40")
+LONG = (120, 100, 40, 1000, 25, 15, 75, "Carbon Steel (New)", "4 inch", "40")
+
+
+def test_single_adiabatic_segment_matches_calculate_hydraulics():
+    r = march_line(*SHORT, n_segments=1, adaptive=False)
+    ref = calculate_hydraulics(*SHORT)
+    assert r["segments"] == 1 and r["converged"] and r["dp_converged"] is None
+    # tek fark: özellikler giriş yerine orta nokta basıncında
+    for k in ("dp_total", "dp_friction", "vel", "re", "f", "power_shaft"):
+        assert r[k] == pytest.approx(ref[k], rel=1e-4), k
+    assert r["outlet_temp_c"] == pytest.approx(60) and r["heat_loss_kw"] == 0
+
+
+def test_outlet_temperature_matches_exponential_decay(monkeypatch):
+    cp = 4200.0
+    monkeypatch.setattr(type(get_backend("Water")), "cp_array", lambda self, T, P: np.full(np.shape(T), cp))
+    u, amb = 15.0, 10.0
+    r = march_line(*LONG, n_segments=50, adaptive=False, u_w_m2k=u, ambient_c=amb)
+    m = 100 * 1000 / 3600
+    od_m = lookup("4 inch", "40")["OD"] / 1000
+    expected = amb + (120 - amb) * math.exp(-u * math.pi * od_m * 1000 / (m * cp))
+    assert r["outlet_temp_c"] == pytest.approx(expected, rel=1e-9)
+    assert r["heat_loss_kw"] == pytest.approx(m * cp * (120 - expected) / 1000, rel=1e-9)
+    assert r["converged"]
+
+
+def test_adaptive_refinement_stops_within_tolerance():
+    r = march_line(*LONG, n_segments=20, rtol=1e-4)
+    assert r["dp_converged"] and r["converged"]
+    assert 20 < r["segments"] < 4096
+    finer = march_line(*LONG, n_segments=2 * r["segments"], adaptive=False)
+    assert finer["dp_total"] == pytest.approx(r["dp_total"], rel=1e-3)
+
+
+def test_segment_limit_is_reported_as_not_converged():
+    r = march_line(*LONG, n_segments=4, rtol=1e-15, max_segments=32)
+    assert r["segments"] == 32
+    assert r["dp_converged"] is False and r["converged"] is False
+
+
+def test_unknown_pipe_is_none():
+    assert march_line(*SHORT[:-1], "XYZ") is None
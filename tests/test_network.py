@@ -0,0 +1,70 @@
+"""Pipe networks: agreement with the single-line calculation and balance on a looped grid."""
+import numpy as np
+import pytest
+
+from hydraulicsuite import calculate_hydraulics
+from hydraulicsuite.network import network_friction_factor, solve_network
+
+PIPE = {"nps": "4 inch", "sch": "40", "material": "Carbon Steel (New)"}
+
+
+@pytest.mark.parametrize("elevation", [0.0, 15.0])
+def test_series_line_matches_calculate_hydraulics(elevation):
+    nodes = [{"id": "src", "pressure_bar": 10.0}, {"id": "mid", "demand_th": 0.0},
+             {"id": "end", "elevation_m": elevation, "demand_th": 100.0}]
+    pipes = [{"id": "p1", "from": "src", "to": "mid", "length_m": 400, **PIPE},
+             {"id": "p2", "from": "mid", "to": "end", "length_m": 600, "fitting_len_m": 25, **PIPE}]
+    r = solve_network(nodes, pipes, temp_c=20, press_bar=10)
+    ref = calculate_hydraulics(20, 100, 10, 1000, 25, elevation, 75, "Carbon Steel (New)", "4 inch", "40")
+    assert r["converged"]
+    assert r["pipes"]["flow_th"].to_numpy() == pytest.approx([100, 100], rel=1e-9)
+    assert r["pipes"]["dp_friction"].sum() == pytest.approx(ref["dp_friction"], rel=1e-9)
+    p_end = r["nodes"].set_index("id").loc["end", "pressure_bar"]
+    assert p_end == pytest.approx(10 - ref["dp_total"], rel=1e-9)
+
+
+def grid(n):
+    """n x n looped grid, 1 t/h drawn at every junction, fed from two opposite corners."""
+    nid = lambda i, j: f"n{i}_{j}"
+    nodes = []
+    for i in range(n):
+        for j in range(n):
+            if (i, j) in ((0, 0), (n - 1, n - 1)):
+                nodes.append({"id": nid(i, j), "pressure_bar": 6.0 if i == 0 else 5.5})
+            else:
+                nodes.append({"id": nid(i, j), "elevation_m": 0.1 * (i + j), "demand_th": 1.0})
+    pipes = []
+    for i in range(n):
+        for j in range(n):
+            if i + 1 < n:
+                pipes.append({"from": nid(i, j), "to": nid(i + 1, j), "length_m": 50, **PIPE})
+            if j + 1 < n:
+                pipes.append({"from": nid(i, j), "to": nid(i, j + 1), "length_m": 50, **PIPE})
+    return nodes, pipes
+
+
+def test_looped_grid_balances_mass_and_energy():
+    nodes, pipes = grid(30)
+    r = solve_network(nodes, pipes)
+    assert r["converged"]
+    nd = r["nodes"].set_index("id")
+    junction = ~nd["fixed"]
+    # Kütle: her bağlantıda tanımlı çekiş, kaynaklar toplamı karşılar
+    np.testing.assert_allclose(nd.loc[junction, "demand_th"], 1.0, atol=1e-9)
+    assert -nd.loc[~junction, "demand_th"].sum() == pytest.approx(junction.sum(), rel=1e-9)
+    # Enerji: her boruda yük farkı = sürtünme kaybı
+    pp = r["pipes"]
+    dh = nd.loc[pp["from"], "head_m"].to_numpy() - nd.loc[pp["to"], "head_m"].to_numpy()
+    np.testing.assert_allclose(dh, pp["headloss_m"], atol=1e-6)
+
+
+def test_friction_bridge_is_continuous():
+    Re = np.array([1999.999, 2000.001, 2299.999, 2300.001])
+    f, _ = network_friction_factor(Re, 0.045, 0.1)
+    assert f[0] == pytest.approx(f[1], rel=1e-5)
+    assert f[2] == pytest.approx(f[3], rel=1e-5)
+
+
+def test_network_needs_a_fixed_node():
+    with pytest.raises(ValueError, match="fixed"):
+        solve_network([{"id": "a"}, {"id": "b"}], [{"from": "a", "to": "b", "length_m": 10, **PIPE}])
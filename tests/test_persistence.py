@@ -0,0 +1,156 @@
+"""ProjectStore: prefix search, keyset paging and schema migrations."""
+import sqlite3
+
+import numpy as np
+import pytest
+
+from hydraulicsuite import persistence
+from hydraulicsuite.persistence import MIGRATIONS, ProjectStore, fts_query
+
+ROWS = [
+    ("Boiler Feed Line", "Carbon Steel (New)", "4 inch", "40", 1.2, 2.5, None),
+    ("Boiler Return", "Stainless Steel", "3 inch", "40", 0.8, 1.9, None),
+    ("Cooling Water Header", "Carbon Steel (New)", "8 inch", "STD", 0.4, 2.1, None),
+    ("Feedwater Bypass", "Copper", "2 inch", "40", 2.2, 3.0, None),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = ProjectStore(str(tmp_path / "projects.db"))
+    yield s
+    s.close()
+
+
+def names(df):
+    return sorted(df["name"])
+
+
+def test_fts_query():
+    assert fts_query("boil  feed!") == '"boil"* "feed"*'
+    assert fts_query("  ") is None
+
+
+def test_multi_word_prefix_match(store):
+    store.insert_many(ROWS)
+    assert names(store.page_projects("boil fe")) == ["Boiler Feed Line"]
+    assert names(store.page_projects("boil")) == ["Boiler Feed Line", "Boiler Return"]
+    assert names(store.page_projects("carb")) == ["Boiler Feed Line", "Cooling Water Header"]
+    assert store.count_projects("fee") == 2
+    assert store.count_projects("") == 4
+    assert store.page_projects("nomatch").empty
+
+
+def test_keyset_pages_do_not_overlap(store):
+    store.insert_many((f"line-{i}", "Copper", "2 inch", "40", 0.1, 1.0, None) for i in range(23))
+    for term in ("", "line"):
+        seen, before = [], None
+        while True:
+            page = store.page_projects(term, before_id=before, limit=10)
+            if page.empty:
+                break
+            ids = list(page["id"])
+            assert ids == sorted(ids, reverse=True)
+            seen += ids
+            before = ids[-1]
+        assert len(seen) == len(set(seen)) == 23
+
+
+def test_search_follows_updates_and_deletes(store):
+    store.insert_many(ROWS)
+    store.execute("UPDATE projects SET name = 'Condensate Drain' WHERE name = 'Feedwater Bypass'")
+    store.execute("DELETE FROM projects WHERE name = 'Boiler Return'")
+    assert names(store.page_projects("cond")) == ["Condensate Drain"]
+    assert store.count_projects("feedw") == 0
+    assert names(store.page_projects("boil")) == ["Boiler Feed Line"]
+
+
+def test_velocity_histogram_matches_numpy(store):
+    vel = np.random.default_rng(3).uniform(0.2, 4.0, 500)
+    vel[:3] = [vel.min() - 0.1, vel.max() + 0.1, vel.max() + 0.1]  # iki satır tam üst sınırda
+    store.insert_many((f"l{i}", "Copper", "2 inch", "40", 0.1, float(v), None) for i, v in enumerate(vel))
+    store.insert_project("no velocity", "Copper", "2 inch", "40", None, None)
+    hist = store.velocity_histogram(nbins=12)
+    counts, edges = np.histogram(vel, bins=12)
+    assert list(hist["count"]) == list(counts)  # son kutu üst sınırı da içerir
+    np.testing.assert_allclose(hist["bin_start"], edges[:-1])
+    np.testing.assert_allclose(hist["bin_end"], edges[1:])
+
+
+def test_velocity_histogram_edge_cases(store):
+    empty = store.velocity_histogram()
+    assert empty.empty and list(empty.columns) == ["bin_start", "bin_end", "count"]
+    store.insert_many([("same", "Copper", "2 inch", "40", 0.1, 2.0, None)] * 7)
+    hist = store.velocity_histogram(nbins=5)
+    assert hist["count"].tolist() == [7, 0, 0, 0, 0]
+    assert hist["bin_start"].iloc[0] == 2.0 and (hist["bin_end"] > hist["bin_start"]).all()
+
+
+def test_material_counts(store):
+    assert store.material_counts().empty
+    store.insert_many(ROWS)
+    store.insert_project("Wall check", None, "4 inch", "40", None, None, 2.0)
+    counts = dict(store.material_counts().itertuples(index=False))
+    assert counts == {"Carbon Steel (New)": 2, "Stainless Steel": 1, "Copper": 1}
+    assert store.material_counts()["count"].iloc[0] == 2
+
+
+def test_bulk_insert_indexes_rows_and_restores_trigger(store):
+    store.insert_many(ROWS, batch_size=3)
+    assert store.count_projects("boil") == 2
+    triggers = {r[0] for r in store.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    assert triggers == {"projects_fts_ai", "projects_fts_ad", "projects_fts_au"}
+    store.insert_project("Boiler Blowdown", "Copper", "1 inch", "80", 0.3, 1.1)
+    assert store.count_projects("boil") == 3
+
+
+def test_set_safety_factor(store):
+    pid = store.insert_project("Boiler Feed Line", "Carbon Steel (New)", "4 inch", "40", 1.2, 2.5)
+    assert store.set_safety_factor(pid, 3.4)
+    assert not store.set_safety_factor(pid + 1, 1.0)
+    assert store.execute("SELECT safety_factor FROM projects WHERE id = ?", (pid,)) == [(3.4,)]
+    assert store.count_projects("boil") == 1  # güncelleme tetikleyicisi indeksi korur
+
+
+def test_failed_migration_rolls_back(tmp_path, monkeypatch):
+    def broken(conn):
+        persistence._create_search_index(conn)
+        raise sqlite3.OperationalError("disk full")
+
+    monkeypatch.setattr(persistence, "MIGRATIONS", MIGRATIONS[:-1] + [(4, broken)])
+    path = str(tmp_path / "broken.db")
+    with pytest.raises(sqlite3.OperationalError):
+        ProjectStore(path)
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 3
+    assert conn.execute("SELECT count(*) FROM sqlite_master WHERE name LIKE 'projects_fts%'").fetchone()[0] == 0
+    conn.close()
+    monkeypatch.undo()
+    s = ProjectStore(path)
+    assert s.schema_version == 4
+    s.close()
+
+
+def test_upgrade_legacy_database(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    # user_version 0: ilk sürümün tablosu, eksik kolonlarla
+    conn.execute("CREATE TABLE projects (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, material TEXT, nps TEXT)")
+    conn.executemany("INSERT INTO projects (name, material, nps) VALUES (?,?,?)",
+                     [("Old Steam Main", "Carbon Steel (Old)", "6 inch"), ("Old Drain", "Copper", "1 inch")])
+    conn.commit()
+    conn.close()
+
+    s = ProjectStore(path)
+    try:
+        assert s.schema_version == MIGRATIONS[-1][0]
+        cols = {row[1] for row in s.execute("PRAGMA table_info(projects)")}
+        assert {"sch", "pressure_drop", "velocity", "safety_factor", "timestamp"} <= cols
+        assert names(s.page_projects("old st")) == ["Old Steam Main"]  # rebuild eski satırları indeksler
+        s.insert_project("Old Stock Line", "Copper", "2 inch", "40", 0.5, 1.0)
+        assert s.count_projects("old st") == 2
+    finally:
+        s.close()
+    reopened = ProjectStore(path)
+    assert reopened.schema_version == MIGRATIONS[-1][0] and reopened.count_projects() == 3
+    reopened.close()
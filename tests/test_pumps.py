@@ -0,0 +1,36 @@
+"""Pump curve fitting from CSV, including blank cells."""
+import io
+
+import numpy as np
+import pytest
+
+from hydraulicsuite.pumps import load_pump_curves
+
+CSV = """pump,flow_m3h,head_m,efficiency_pct
+P-1,0,40,
+P-1,50,38,60
+P-1,100,33,75
+P-1,150,25,68
+"""
+
+
+@pytest.mark.parametrize("method", ["poly", "pchip"])
+def test_blank_efficiency_cell_is_skipped(method):
+    pump = load_pump_curves(io.StringIO(CSV), method=method)["P-1"]
+    assert pump.q_max == 150
+    assert pump.head(0) == pytest.approx(40)
+    assert pump.efficiency(100) == pytest.approx(75)
+    assert np.isfinite(pump.efficiency([50, 75, 150])).all()
+
+
+def test_efficiency_needs_two_points():
+    csv = CSV.replace("60", "").replace("75", "").replace("68", "")
+    pump = load_pump_curves(io.StringIO(csv))["P-1"]
+    assert np.isfinite(pump.head(75))
+    assert np.isnan(pump.efficiency(75))
+
+
+def test_head_needs_two_points():
+    csv = "pump,flow_m3h,head_m\nP-2,0,40\nP-2,50,\n"
+    with pytest.raises(ValueError, match="P-2"):
+        load_pump_curves(io.StringIO(csv))
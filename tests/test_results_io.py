@@ -0,0 +1,41 @@
+"""Chunked exports: CSV/Parquet spooling and Parquet round trips."""
+import io
+import os
+import tempfile
+
+import pandas as pd
+import pytest
+
+from hydraulicsuite.results_io import read_results, spool_csv, spool_parquet, write_parquet
+
+
+def chunks():
+    for i in range(3):
+        yield pd.DataFrame({"case_id": range(i * 10, i * 10 + 10), "material": "Copper", "dp": 0.5 * i})
+
+
+def temp_files():
+    return set(os.listdir(tempfile.gettempdir()))
+
+
+def test_spool_csv_returns_bytes_and_removes_temp_file():
+    before = temp_files()
+    data = spool_csv(chunks())
+    assert isinstance(data, bytes)
+    assert temp_files() <= before
+    df = pd.read_csv(io.BytesIO(data))
+    assert list(df["case_id"]) == list(range(30))
+
+
+def test_spool_parquet_round_trip():
+    pytest.importorskip("pyarrow")
+    df = pd.read_parquet(io.BytesIO(spool_parquet(chunks())))
+    assert len(df) == 30 and df["dp"].max() == 1.0
+
+
+def test_read_results_pushes_filters(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "part.parquet")
+    assert write_parquet(chunks(), path) == 30
+    df = read_results(path, columns=["case_id"], filters=[("dp", ">", 0.25)])
+    assert list(df.columns) == ["case_id"] and list(df["case_id"]) == list(range(10, 30))
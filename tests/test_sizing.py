@@ -0,0 +1,69 @@
+"""Inverse problems: line sizing against brute force, max flow and pump head."""
+import pytest
+
+from hydraulicsuite import calculate_hydraulics
+from hydraulicsuite.data import fitting_led_database
+from hydraulicsuite.sizing import _candidates, max_flow, required_pump_head, size_line
+
+PROCESS = dict(flow_th=100, temp_c=60, press_bar=20, length_m=500, material="Carbon Steel (New)")
+FITTINGS_LED = 4 * fitting_led_database["Elbow 90° (Standard Radius)"] + 2 * fitting_led_database["Gate Valve (Fully Open)"]
+
+
+def brute_force(max_dp_bar, max_vel, fitting_led=0.0, asme_material=None):
+    p = PROCESS
+    passing = []
+    for ID_mm, cost, nps, sch in _candidates(p["press_bar"], asme_material):
+        res = calculate_hydraulics(p["temp_c"], p["flow_th"], p["press_bar"], p["length_m"], fitting_led * ID_mm / 1000,
+                                   0, 75, p["material"], nps, sch)
+        if res is not None and res["dp_total"] <= max_dp_bar and res["vel"] <= max_vel:
+            passing.append((cost, ID_mm, nps, sch))
+    return min(passing)[2:] if passing else None
+
+
+@pytest.mark.parametrize("max_dp, max_vel, led, asme", [
+    (1.0, 3.0, 0.0, None),
+    (0.2, 2.0, 0.0, None),
+    (0.5, 3.0, FITTINGS_LED, None),
+    (1.0, 3.0, 0.0, "A106 Grade B"),
+    (0.05, 1.0, FITTINGS_LED, "SS 304 (A312 TP304)"),
+])
+def test_size_line_matches_brute_force(max_dp, max_vel, led, asme):
+    r = size_line(**PROCESS, max_dp_bar=max_dp, max_vel=max_vel, fitting_led=led, asme_material=asme)
+    assert (r["nps"], r["sch"]) == brute_force(max_dp, max_vel, led, asme)
+    assert r["dp_total"] <= max_dp and r["vel"] <= max_vel
+    assert r["evaluations"] < len(_candidates(PROCESS["press_bar"], asme)) / 4
+
+
+def test_size_line_fittings_follow_candidate_id():
+    r = size_line(**PROCESS, max_dp_bar=0.5, max_vel=3.0, fitting_led=FITTINGS_LED)
+    # CALCULATE bu boruyu seçtiğinde aynı eşdeğer uzunluğu kullanır
+    check = calculate_hydraulics(60, 100, 20, 500, FITTINGS_LED * r["id_mm"] / 1000, 0, 75, "Carbon Steel (New)",
+                                 r["nps"], r["sch"])
+    assert check["dp_total"] == pytest.approx(r["dp_total"]) and check["dp_total"] <= 0.5
+    straight = size_line(**PROCESS, max_dp_bar=0.5, max_vel=3.0)
+    assert r["id_mm"] >= straight["id_mm"]
+
+
+def test_size_line_none_when_nothing_fits():
+    assert size_line(**PROCESS, max_dp_bar=1e-9) is None
+
+
+def test_max_flow_round_trip():
+    flow, evaluations = max_flow(0.8, 60, 20, 500, "Carbon Steel (New)", "4 inch", "40", elevation_m=2.0)
+    res = calculate_hydraulics(60, flow, 20, 500, 0, 2.0, 75, "Carbon Steel (New)", "4 inch", "40")
+    assert res["dp_total"] == pytest.approx(0.8, rel=1e-5)
+    assert evaluations < 40
+
+
+def test_max_flow_edge_cases():
+    assert max_flow(0.1, 60, 20, 500, "Carbon Steel (New)", "4 inch", "40", elevation_m=5.0)[0] == 0.0
+    assert max_flow(0.8, 60, 20, 500, "Carbon Steel (New)", "4 inch", "XYZ")[0] is None
+
+
+def test_required_pump_head_adds_terminal_pressure():
+    base = calculate_hydraulics(60, 100, 20, 500, 0, 10, 75, "Carbon Steel (New)", "4 inch", "40")
+    r = required_pump_head(100, 60, 20, 500, "Carbon Steel (New)", "4 inch", "40", elevation_m=10,
+                           delivery_pressure_bar=3.0, suction_pressure_bar=1.0)
+    assert r["head_m"] == pytest.approx(base["head_m"] + 2e5 / (base["rho"] * 9.81))
+    assert r["dp_total"] == pytest.approx(base["dp_total"] + 2.0)
+    assert r["power_shaft"] == pytest.approx(r["power_hyd"] / 0.75)
@@ -0,0 +1,47 @@
+"""Resumable sweeps: skipped chunks, spec checks and case order on reload."""
+import os
+
+import numpy as np
+import pytest
+
+from hydraulicsuite.sweep import CHUNK_PATTERN, load_sweep, make_sweep_spec, pending_chunks, run_sweep, sweep_size
+
+pytest.importorskip("pyarrow")
+
+
+def small_spec(**kw):
+    return make_sweep_spec(flows=[10, 50, 100], temps=[20, 60], nps=["2 inch", "4 inch"], schedules=["40"],
+                           materials=["Carbon Steel (New)", "Copper"], chunk_size=5, **kw)
+
+
+def test_resume_recomputes_only_missing_chunk(tmp_path):
+    spec, out = small_spec(), str(tmp_path)
+    n_chunks = len(pending_chunks(spec, out))
+    assert sweep_size(spec) == 24 and n_chunks == 5
+    assert run_sweep(spec, out, max_workers=2) == n_chunks
+    assert run_sweep(spec, out, max_workers=2) == 0
+    first = load_sweep(out)
+
+    os.remove(os.path.join(out, CHUNK_PATTERN.format(2)))
+    assert [c[0] for c in pending_chunks(spec, out)] == [2]
+    assert run_sweep(spec, out, max_workers=2) == 1
+
+    df = load_sweep(out)
+    assert list(df["case_id"]) == list(range(24))
+    assert df["valid"].all()
+    np.testing.assert_array_equal(df["dp_total"], first["dp_total"])
+
+
+def test_different_spec_is_rejected(tmp_path):
+    out = str(tmp_path)
+    run_sweep(small_spec(), out, max_workers=1)
+    with pytest.raises(ValueError, match="different sweep"):
+        run_sweep(small_spec(press_bar=20.0), out, max_workers=1)
+
+
+def test_load_sweep_projects_and_filters(tmp_path):
+    out = str(tmp_path)
+    run_sweep(small_spec(), out, max_workers=1)
+    df = load_sweep(out, columns=["case_id", "material"], filters=[("material", "==", "Copper")])
+    assert list(df.columns) == ["case_id", "material"]
+    assert len(df) == 12 and (df["material"] == "Copper").all()
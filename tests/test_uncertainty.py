@@ -0,0 +1,45 @@
+"""Monte Carlo studies: seeded reproducibility and the all-invalid case."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from hydraulicsuite import make_uncertainty_spec, run_uncertainty
+from hydraulicsuite.uncertainty import percentile_table, run_samples
+
+NOMINAL = dict(temp_c=60, flow_th=100, press_bar=20, length_m=500, fitting_len_m=10, elevation_m=0, pump_eff=75,
+               material="Carbon Steel (New)", nps="4 inch", sch="40")
+DISTRIBUTIONS = {"flow_th": ("normal", 100, 5), "temp_c": ("uniform", 40, 80), "roughness_mm": ("uniform", 0.045, 0.5)}
+
+
+def spec(n=5_000, seed=7, **nominal):
+    return make_uncertainty_spec({**NOMINAL, **nominal}, DISTRIBUTIONS, n=n, seed=seed, chunk_size=1_000)
+
+
+def test_result_does_not_depend_on_worker_count():
+    s = spec()
+    serial = run_samples(s, max_workers=1)
+    assert len(serial) == 5_000 and serial["valid"].all()
+    assert serial.equals(run_samples(s, max_workers=3))
+
+
+def test_seed_changes_samples():
+    assert not run_samples(spec(n=1_000, seed=1))["flow_th"].equals(run_samples(spec(n=1_000, seed=2))["flow_th"])
+
+
+def test_run_uncertainty_tables():
+    r = run_uncertainty(spec())
+    pct = r["percentiles"]
+    assert r["n_valid"] == r["n"] == 5_000
+    assert pct.loc["dp_total", "p5"] < pct.loc["dp_total", "p50"] < pct.loc["dp_total", "p95"]
+    assert list(r["tornado"]["swing"]) == sorted(r["tornado"]["swing"], reverse=True)
+
+
+def test_no_valid_case_raises():
+    with pytest.raises(ValueError, match="None of the 1,000 cases"):
+        run_uncertainty(spec(n=1_000, sch="XYZ"))
+
+
+def test_percentile_table_without_valid_rows_is_nan():
+    samples = pd.DataFrame({"dp_total": [1.0, 2.0], "dp_friction": 1.0, "power_shaft": 1.0, "vel": 1.0,
+                            "valid": False})
+    assert np.isnan(percentile_table(samples).to_numpy()).all()
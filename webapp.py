@@ -1,10 +1,24 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
-import math
-from CoolProp.CoolProp import PropsSI
+import numpy as np
+import io
+import os
+import json
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
+
+from hydraulicsuite import (
+    material_list_roughness, fitting_led_database, fluid_list, PropertyError, asme_material_data, NPS_SIZES, SCHEDULES, default_schedule,
+    get_ID, calculate_hydraulics, calculate_hydraulics_batch, check_wall_thickness, size_line
+)
+from hydraulicsuite.persistence import ProjectStore
+from hydraulicsuite.pumps import PUMP_CURVES_FILE, load_pump_curves, operating_point, select_pumps, system_curve
+from hydraulicsuite.transient import SCENARIOS, simulate_transient
+from hydraulicsuite.marching import march_line
+from hydraulicsuite.uncertainty import make_uncertainty_spec, run_uncertainty
+from hydraulicsuite.results_io import read_results, spool_csv, spool_parquet
+from hydraulicsuite.instrument import RerunProfiler, available_profilers, configure_json_log, stage, start_rerun
 
 # --- 1. SAYFA AYARLARI ---
 st.set_page_config(
@@ -14,175 +28,165 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# --- ÖLÇÜM: her yeniden çalıştırmada aşama süreleri (tanılama paneli; JSON log yalnızca HYDRAULICSUITE_PERF_LOG ile) ---
+if os.environ.get("HYDRAULICSUITE_PERF_LOG"):
+    configure_json_log(os.environ["HYDRAULICSUITE_PERF_LOG"])
+st.session_state.setdefault("diag_session", os.urandom(4).hex())
+st.session_state["diag_run"] = st.session_state.get("diag_run", 0) + 1
+interrupted = st.session_state.pop("diag_profiler", None)
+if interrupted:
+    interrupted.stop()  # önceki çalıştırma yarıda kesildi (st.rerun / widget değişimi)
+profiler = None
+if st.session_state.get("diag_profile") and st.session_state["diag_run"] >= st.session_state.get("diag_armed_at", 0) + 2:
+    profiler = RerunProfiler(st.session_state.get("diag_engine", "cProfile"))
+    try:
+        profiler.start()
+        st.session_state["diag_profiler"] = profiler
+    except (ValueError, ImportError) as e:  # ör. başka bir oturum zaten profil alıyor
+        st.session_state["diag_profile_result"] = {"error": str(e)}
+        profiler = None
+rerun = start_rerun(session=st.session_state["diag_session"], run=st.session_state["diag_run"])
+
 # --- VERİTABANI DOSYA ADI ---
 DB_FILE = "project_data_final.db"
 
 # --- 2. DATABASE KURULUMU ---
-def init_db():
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS projects (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            material TEXT,
-            nps TEXT,
-            sch TEXT,
-            pressure_drop REAL,
-            velocity REAL,
-            safety_factor REAL
-        )
-    """)
-    conn.commit()
-    conn.close()
-
-init_db()
-
-# --- 3. SABİTLER & VERİLER ---
-
-material_list_roughness = {
-    "Carbon Steel (New)": 0.045,
-    "Carbon Steel (Corroded)": 0.5,
-    "Stainless Steel": 0.0015,
-    "Copper": 0.0015,
-    "PVC / Plastic": 0.0015,
-    "Concrete": 0.01,
-    "Galvanized Steel": 0.15
-}
-
-# Fitting Eşdeğer Uzunluk Katsayıları (Le/D)
-fitting_led_database = {
-    "Elbow 90° (Standard Radius)": 30,
-    "Elbow 90° (Long Radius)": 20,
-    "Elbow 45°": 16,
-    "Tee (Flow through Run)": 20,
-    "Tee (Flow through Branch)": 60,
-    "Gate Valve (Fully Open)": 8,
-    "Globe Valve (Fully Open)": 340,
-    "Swing Check Valve": 100,
-    "Butterfly Valve": 45,
-    "Ball Valve (Reduced Bore)": 3
-}
-
-asme_material_data = {
-    "--- CARBON STEEL ---": 0,
-    "A106 Grade A": 110.0,
-    "A106 Grade B": 138.0,
-    "A106 Grade C": 161.0,
-    "A53 Grade A": 110.0,
-    "A53 Grade B": 138.0,
-    "API 5L Grade B": 138.0,
-    "API 5L X42 (L290)": 138.0,
-    "API 5L X52 (L360)": 153.0,
-    "API 5L X60 (L415)": 173.0,
-    "API 5L X65 (L450)": 178.0,
-    "A333 Grade 6 (Low Temp)": 138.0,
-    "--- STAINLESS STEEL ---": 0,
-    "SS 304 (A312 TP304)": 138.0,
-    "SS 304L (A312 TP304L)": 115.0,
-    "SS 316 (A312 TP316)": 138.0,
-    "SS 316L (A312 TP316L)": 115.0,
-    "SS 321 (A312 TP321)": 138.0,
-    "SS 347 (A312 TP347)": 138.0,
-    "--- ALLOY STEEL ---": 0,
-    "A335 P11 (1-1/4 Cr)": 126.0,
-    "A335 P22 (2-1/4 Cr)": 126.0,
-    "A335 P5 (5 Cr)": 126.0,
-    "A335 P9 (9 Cr)": 138.0,
-    "A335 P91 (9 Cr-V)": 195.0
-}
-
-pipe_database = {
-    "1/2 inch": {"10": {"OD": 21.3, "WT": 2.11}, "40": {"OD": 21.3, "WT": 2.77}, "80": {"OD": 21.3, "WT": 3.73}},
-    "3/4 inch": {"10": {"OD": 26.7, "WT": 2.11}, "40": {"OD": 26.7, "WT": 2.87}, "80": {"OD": 26.7, "WT": 3.91}},
-    "1 inch":   {"10": {"OD": 33.4, "WT": 2.77}, "40": {"OD": 33.4, "WT": 3.38}, "80": {"OD": 33.4, "WT": 4.55}},
-    "1 1/2 inch": {"10": {"OD": 48.3, "WT": 2.77}, "40": {"OD": 48.3, "WT": 3.68}, "80": {"OD": 48.3, "WT": 5.08}},
-    "2 inch":   {"10": {"OD": 60.3, "WT": 2.77}, "40": {"OD": 60.3, "WT": 3.91}, "80": {"OD": 60.3, "WT": 5.54}},
-    "3 inch":   {"10": {"OD": 88.9, "WT": 3.05}, "40": {"OD": 88.9, "WT": 5.49}, "80": {"OD": 88.9, "WT": 7.62}},
-    "4 inch":   {"10": {"OD": 114.3, "WT": 3.05}, "40": {"OD": 114.3, "WT": 6.02}, "80": {"OD": 114.3, "WT": 8.56}, "120": {"OD": 114.3, "WT": 11.13}, "160": {"OD": 114.3, "WT": 13.49}, "XXS": {"OD": 114.3, "WT": 17.12}},
-    "6 inch":   {"10": {"OD": 168.3, "WT": 3.40}, "40": {"OD": 168.3, "WT": 7.11}, "80": {"OD": 168.3, "WT": 10.97}, "120": {"OD": 168.3, "WT": 14.27}, "160": {"OD": 168.3, "WT": 18.26}},
-    "8 inch":   {"10": {"OD": 219.1, "WT": 3.76}, "40": {"OD": 219.1, "WT": 8.18}, "60": {"OD": 219.1, "WT": 10.31}, "80": {"OD": 219.1, "WT": 12.70}, "100": {"OD": 219.1, "WT": 15.09}, "120": {"OD": 219.1, "WT": 18.26}, "140": {"OD": 219.1, "WT": 20.62}, "160": {"OD": 219.1, "WT": 23.01}},
-    "10 inch":  {"10": {"OD": 273.0, "WT": 4.19}, "20": {"OD": 273.0, "WT": 6.35}, "30": {"OD": 273.0, "WT": 7.80}, "40": {"OD": 273.0, "WT": 9.27}, "60": {"OD": 273.0, "WT": 12.70}, "80": {"OD": 273.0, "WT": 15.09}, "100": {"OD": 273.0, "WT": 18.26}, "120": {"OD": 273.0, "WT": 21.44}, "140": {"OD": 273.0, "WT": 25.40}, "160": {"OD": 273.0, "WT": 28.58}},
-    "12 inch":  {"10": {"OD": 323.8, "WT": 4.57}, "20": {"OD": 323.8, "WT": 6.35}, "30": {"OD": 323.8, "WT": 8.38}, "40": {"OD": 323.8, "WT": 10.31}, "60": {"OD": 323.8, "WT": 14.27}, "80": {"OD": 323.8, "WT": 17.48}, "100": {"OD": 323.8, "WT": 21.44}, "120": {"OD": 323.8, "WT": 25.40}, "140": {"OD": 323.8, "WT": 28.58}, "160": {"OD": 323.8, "WT": 33.32}}
-}
-
-def get_ID(nps, sch):
-    if nps in pipe_database and sch in pipe_database[nps]:
-        d = pipe_database[nps][sch]
-        return d["OD"] - 2 * d["WT"]
-    return None
-
-# --- GELİŞMİŞ HESAPLAMA FONKSİYONU ---
-def calculate_hydraulics(temp_c, flow_th, press_bar, length_m, fitting_len_m, elevation_m, pump_eff, material, nps, sch):
-    try:
-        roughness = material_list_roughness.get(material, 0.045)
-        
-        if nps not in pipe_database or sch not in pipe_database[nps]:
-            return None
+@st.cache_resource
+def get_db():
+    # Tüm oturumlar için tek, WAL modunda paylaşılan bağlantı (şema göçleri burada uygulanır)
+    return ProjectStore(DB_FILE)
 
-        d_info = pipe_database[nps][sch]
-        ID_mm = d_info["OD"] - 2 * d_info["WT"]
-        
-        if ID_mm <= 0: return None
-            
-        ID_m = ID_mm / 1000.0
-        
-        T_K = temp_c + 273.15
-        P_Pa = press_bar * 100000
-        m_kg_s = flow_th * 1000 / 3600
-        
-        try:
-            rho = PropsSI('D', 'T', T_K, 'P', P_Pa, 'Water')
-            mu = PropsSI('V', 'T', T_K, 'P', P_Pa, 'Water')
-        except:
-            return None
-        
-        Area = math.pi * (ID_m / 2)**2
-        velocity = m_kg_s / (rho * Area)
-        Re = (rho * velocity * ID_m) / mu
-        
-        # --- REYNOLDS KONTROLÜ ---
-        if Re >= 2300:
-            if roughness/1000/ID_m/3.7 <= 0 and Re == 0:
-                 f = 0
-            else:
-                 f = (-1.8 * math.log10((roughness/1000/ID_m/3.7)**1.11 + 6.9/Re))**-2
-        elif Re > 0:
-            f = 64 / Re
-        else:
-            f = 0
-            
-        total_effective_length = length_m + fitting_len_m
-        dP_friction_Pa = f * (total_effective_length / ID_m) * (rho * velocity**2 / 2)
-        
-        g = 9.81
-        dP_static_Pa = rho * g * elevation_m
-        dP_total_Pa = dP_friction_Pa + dP_static_Pa
-        dP_total_bar = dP_total_Pa / 100000
-        
-        head_m = dP_total_Pa / (rho * g)
-        
-        flow_m3_h = flow_th / (rho / 1000) 
-        power_hydraulic_kW = (flow_m3_h * head_m * rho * g) / (3.6 * 1e6)
-        
-        eff_factor = pump_eff / 100.0 if pump_eff > 0 else 0.01
-        power_shaft_kW = power_hydraulic_kW / eff_factor
-        
-        return {
-            "dp_total": dP_total_bar, 
-            "dp_friction": dP_friction_Pa/100000,
-            "dp_static": dP_static_Pa/100000, 
-            "head_m": head_m,
-            "vel": velocity, 
-            "re": Re, "f": f,
-            "rho": rho, "mu": mu, "id_mm": ID_mm, 
-            "power_hyd": power_hydraulic_kW,
-            "power_shaft": power_shaft_kW,
-            "total_len": total_effective_length
-        }
-    except Exception as e:
-        return None
+db = get_db()
+
+@st.cache_data(ttl=600, max_entries=256)
+def count_projects(search_term, last_id):
+    # last_id sadece önbellek anahtarı: yeni kayıt eklenince sayım yenilenir
+    return db.count_projects(search_term)
+
+@st.cache_data(ttl=600, max_entries=64)
+def history_aggregates(last_id, nbins=10):
+    return db.material_counts(), db.velocity_histogram(nbins)
+
+@st.cache_resource(max_entries=8)
+def get_pump_curves(csv_bytes):
+    # Aynı dosya için eğri uydurmaları bir kez yapılır
+    return load_pump_curves(io.BytesIO(csv_bytes))
+
+# --- ÖNBELLEK: girdilere göre anahtarlanan sonuçlar ve grafik JSON'ları ---
+# Her widget değişimi betiği baştan çalıştırır; aynı girdiler yeniden hesaplanmaz,
+# grafikler px/go ile yeniden kurulmak yerine önbellekteki JSON'dan çizilir.
+@st.cache_data(ttl=600, max_entries=512)
+def cached_hydraulics(*args):
+    return calculate_hydraulics(*args)
+
+@st.cache_data(ttl=600, max_entries=64)
+def cached_march(*args, **kwargs):
+    return march_line(*args, **kwargs)
+
+@st.cache_data(ttl=600, max_entries=256)
+def cached_system_curve(*args, **kwargs):
+    return system_curve(*args, **kwargs)
+
+@st.cache_data(ttl=600, max_entries=64)
+def simulation_table(temp_c, flow_th, press_bar, length_m, material):
+    sizes = NPS_SIZES
+    schs = [default_schedule(s) for s in sizes]
+    res = calculate_hydraulics_batch(temp_c=temp_c, flow_th=flow_th, press_bar=press_bar, length_m=length_m,
+                                     fitting_len_m=0, elevation_m=0, pump_eff=75, material=material,
+                                     nps=sizes, sch=schs)
+    res["NPS"] = sizes
+    res = res[res["valid"]]
+    return pd.DataFrame({
+        "NPS": res["NPS"], "ID (mm)": res['id_mm'],
+        "Velocity (m/s)": res['vel'], "Pressure Drop (bar)": res['dp_total'],
+        "Power (kW)": res['power_shaft']
+    })
+
+def show_figure(fig_json):
+    st.plotly_chart(pio.from_json(fig_json), use_container_width=True)
+
+@st.cache_data(ttl=600, max_entries=256)
+def breakdown_figure(dp_friction, dp_static):
+    fig = px.pie(
+        values=[max(0, dp_friction), max(0, dp_static)],
+        names=["Friction Loss (Pipe+Fittings)", "Static Head (Elevation)"],
+        hole=0.4,
+        color_discrete_sequence=['#FF4B4B', '#00CC96']
+    )
+    fig.update_layout(height=300, margin=dict(t=0, b=0, l=0, r=0))
+    return fig.to_json()
+
+@st.cache_data(ttl=600, max_entries=64)
+def profile_figure(prof):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=prof["x_m"], y=prof["press_bar"], name="Pressure (bar)"))
+    fig.add_trace(go.Scatter(x=prof["x_m"], y=prof["temp_c"], name="Temperature (°C)", yaxis="y2"))
+    fig.update_layout(height=300, xaxis_title="Distance (m)", yaxis_title="Pressure (bar)",
+                      yaxis2=dict(title="Temperature (°C)", overlaying="y", side="right"),
+                      margin=dict(t=20, b=0, l=0, r=0), legend=dict(orientation="h"))
+    return fig.to_json()
+
+@st.cache_data(ttl=600, max_entries=256)
+def wall_figure(req, act):
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=["Required", "Actual"], y=[req, act], marker_color=['#FF4B4B', '#00CC96']))
+    return fig.to_json()
+
+@st.cache_data(ttl=600, max_entries=64)
+def simulation_figure(*inputs):
+    fig = px.scatter(simulation_table(*inputs), x="Velocity (m/s)", y="Power (kW)",
+                     color="NPS", size="ID (mm)", size_max=40,
+                     text="NPS", title="Power Consumption vs Velocity")
+    fig.update_traces(textposition='top center')
+    return fig.to_json()
+
+@st.cache_data(ttl=600, max_entries=16)
+def uncertainty_figures(spec_key, _r):
+    # _r (örnekler) hash'lenmez; anahtar çalıştırmanın spec'i
+    pct = _r["percentiles"]
+    # Histogram sunucuda; tarayıcıya 1M nokta gönderilmez
+    counts, edges = np.histogram(_r["samples"].loc[_r["samples"]["valid"], "dp_total"], bins=60)
+    fig_mc = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges)))
+    for q in ("p5", "p50", "p95"):
+        fig_mc.add_vline(x=pct.loc["dp_total", q], line_dash="dot", annotation_text=q.upper())
+    fig_mc.update_layout(title="Pressure Drop Distribution", xaxis_title="dP (bar)", yaxis_title="cases", bargap=0)
+
+    tor = _r["tornado"].iloc[::-1]
+    base_dp = pct.loc["dp_total", "p50"]
+    fig_tor = go.Figure()
+    fig_tor.add_trace(go.Bar(y=tor["input"], x=tor["out_low"] - base_dp, base=base_dp, orientation="h", name="P5 input"))
+    fig_tor.add_trace(go.Bar(y=tor["input"], x=tor["out_high"] - base_dp, base=base_dp, orientation="h", name="P95 input"))
+    fig_tor.update_layout(title="Sensitivity (Tornado)", barmode="overlay", xaxis_title="dP (bar)")
+    return fig_mc.to_json(), fig_tor.to_json()
+
+@st.cache_data(ttl=600, max_entries=64)
+def history_figures(last_id):
+    df_mat, df_vel = history_aggregates(last_id)
+    fig_pie = px.pie(df_mat, names='material', values='count', hole=0.4, title="Material Usage")
+    fig_hist = go.Figure(go.Bar(
+        x=(df_vel["bin_start"] + df_vel["bin_end"]) / 2, y=df_vel["count"],
+        width=df_vel["bin_end"] - df_vel["bin_start"],
+    ))
+    fig_hist.update_layout(title="Velocity Distribution", xaxis_title="velocity", yaxis_title="count", bargap=0)
+    return fig_pie.to_json(), fig_hist.to_json()
+
+@st.cache_data(ttl=600, max_entries=16)
+def surge_figures(run_key, _r):
+    hist = _r['history']
+    fig_t = go.Figure()
+    for col, label in [("p_0", "Inlet"), ("p_0.5", "Midpoint"), ("p_1", "Outlet")]:
+        fig_t.add_trace(go.Scatter(x=hist["t"], y=hist[col], name=label))
+    fig_t.update_layout(height=320, xaxis_title="Time (s)", yaxis_title="Pressure (bar)", margin=dict(t=20, b=0, l=0, r=0))
+
+    env = _r['envelope']
+    step = max(1, len(env) // 2000)  # çizim için seyrelt
+    env = env.iloc[::step]
+    fig_e = go.Figure()
+    fig_e.add_trace(go.Scatter(x=env["x_m"], y=env["p_max_bar"], name="Max", line=dict(color="#FF4B4B")))
+    fig_e.add_trace(go.Scatter(x=env["x_m"], y=env["p_min_bar"], name="Min", line=dict(color="#00CC96")))
+    fig_e.add_trace(go.Scatter(x=env["x_m"], y=env["p_steady_bar"], name="Steady", line=dict(dash="dot")))
+    fig_e.update_layout(height=320, xaxis_title="Distance (m)", yaxis_title="Pressure (bar)", margin=dict(t=20, b=0, l=0, r=0))
+    return fig_t.to_json(), fig_e.to_json()
 
 # ==================================================
 # SOL MENÜ
@@ -197,12 +201,14 @@ with st.sidebar:
         [
             "🏠 Pressure Drop Calc", 
             "🛡️ Wall Thickness Check", 
+            "🌊 Water Hammer",
             "📈 Analytics & Simulation",
             "📚 Project History"
         ]
     )
     st.markdown("---")
     st.caption("v5.2 | Engineering Tools") 
+rerun.context["page"] = page_selection
 
 # ==================================================
 # SAYFA 1: PRESSURE DROP CALCULATOR (GELİŞMİŞ)
@@ -222,10 +228,11 @@ if page_selection == "🏠 Pressure Drop Calc":
             
             c3, c4 = st.columns(2)
             with c3:
-                nps_selected = st.selectbox("Nominal Size (Inch)", list(pipe_database.keys()), index=6)
+                nps_selected = st.selectbox("Nominal Size (Inch)", NPS_SIZES, index=NPS_SIZES.index("4 inch"))
             with c4:
-                available_schedules = list(pipe_database[nps_selected].keys())
-                sch_selected = st.selectbox("Schedule", available_schedules)
+                available_schedules = SCHEDULES[nps_selected]
+                sch_selected = st.selectbox("Schedule", available_schedules,
+                                            index=available_schedules.index(default_schedule(nps_selected)))
             
             # Seçilen borunun ID'sini hemen alalım
             current_ID_mm = get_ID(nps_selected, sch_selected)
@@ -235,10 +242,25 @@ if page_selection == "🏠 Pressure Drop Calc":
             
             # --- Akışkan ve Hat Bilgileri ---
             st.subheader("⚙️ Process Data")
+            c_f1, c_f2 = st.columns(2)
+            with c_f1:
+                fluid = fluid_list[st.selectbox("Fluid", list(fluid_list.keys()), key="fluid")]
+            with c_f2:
+                two_phase = st.toggle("Two-Phase (at saturation)", key="two_phase",
+                                      disabled=fluid.startswith("INCOMP::"),
+                                      help="Steam/condensate and flashing lines: temperature is the saturation temperature at line pressure")
+            quality, tp_model = None, "homogeneous"
+            if two_phase and not fluid.startswith("INCOMP::"):
+                c_q1, c_q2 = st.columns(2)
+                with c_q1:
+                    quality = st.slider("Vapour Quality (mass fraction)", 0.0, 1.0, 0.1, step=0.01, key="quality")
+                with c_q2:
+                    tp_model = st.selectbox("Two-Phase Model", ["homogeneous", "lockhart_martinelli"],
+                                            format_func=lambda m: m.replace("_", "-").title(), key="tp_model")
             c1, c2 = st.columns(2)
             with c1:
                 flow = st.number_input("Mass Flow (t/h)", 100.0, step=10.0)
-                temp = st.number_input("Temperature (°C)", 120.0, step=1.0)
+                temp = st.number_input("Temperature (°C)", 120.0, step=1.0, disabled=quality is not None)
                 pressure = st.number_input("Line Pressure (bar)", 40.0)
             with c2:
                 length = st.number_input("Straight Pipe Length (m)", 1000.0, step=50.0)
@@ -246,6 +268,7 @@ if page_selection == "🏠 Pressure Drop Calc":
 
             # --- FITTING HESAPLAYICI ---
             calculated_fitting_len = 0.0
+            fitting_led_total = 0.0  # boyutlandırma için: her aday kendi ID'si ile çarpar
             with st.expander("🔧 Fitting & Valve Calculator (Optional)"):
                 st.caption("Select quantities to calculate Equivalent Length (Le)")
                 
@@ -260,6 +283,7 @@ if page_selection == "🏠 Pressure Drop Calc":
                         if qty > 0:
                             eq_len = qty * led_val * current_ID_m
                             calculated_fitting_len += eq_len
+                            fitting_led_total += qty * led_val
                             
                 with col_fit2:
                     for name, led_val in items[half:]:
@@ -267,6 +291,7 @@ if page_selection == "🏠 Pressure Drop Calc":
                         if qty > 0:
                             eq_len = qty * led_val * current_ID_m
                             calculated_fitting_len += eq_len
+                            fitting_led_total += qty * led_val
                 
                 if calculated_fitting_len > 0:
                     st.info(f"Total Equivalent Length added: **{calculated_fitting_len:.2f} m**")
@@ -275,28 +300,75 @@ if page_selection == "🏠 Pressure Drop Calc":
 
             st.markdown("---")
             pump_eff = st.number_input("Pump Efficiency (%)", 75.0, step=5.0)
+
+            # --- HAT BOYUTLANDIRMA ---
+            with st.expander("🎯 Line Sizing Assistant"):
+                st.caption("Finds the lightest NPS/Schedule that meets the limits for the process data above.")
+                c_sz1, c_sz2 = st.columns(2)
+                with c_sz1:
+                    size_max_dp = st.number_input("Max Pressure Drop (bar)", 1.0, step=0.1, key="size_dp")
+                    size_max_vel = st.number_input("Max Velocity (m/s)", 3.0, step=0.5, key="size_vel")
+                with c_sz2:
+                    size_asme = st.selectbox("ASME Spec (wall check)", ["None"] + [k for k, v in asme_material_data.items() if v > 0], key="size_asme")
+                if st.button("Suggest Size", use_container_width=True):
+                    try:
+                        sized = size_line(flow, temp, pressure, length, material_name, max_dp_bar=size_max_dp, max_vel=size_max_vel,
+                                          fitting_led=fitting_led_total, elevation_m=elevation, pump_eff=pump_eff,
+                                          asme_material=None if size_asme == "None" else size_asme,
+                                          fluid=fluid, quality=quality, two_phase_model=tp_model)
+                    except PropertyError as e:
+                        st.error(f"Property Error: {e}")
+                    else:
+                        if sized:
+                            st.success(f"**{sized['nps']} Sch {sized['sch']}** · dP {sized['dp_total']:.3f} bar · "
+                                       f"{sized['vel']:.2f} m/s · {sized['cost']:.1f} kg/m ({sized['evaluations']} cases evaluated)")
+                        else:
+                            st.warning("No pipe in the catalogue meets these limits.")
+            # --- SEGMENTLİ HESAP ---
+            with st.expander("📏 Segmented Calculation (long / hot lines)"):
+                st.caption("Splits the line into segments and updates pressure, temperature and properties along it.")
+                seg_on = st.toggle("Use segmented calculation", key="seg_on", disabled=quality is not None)
+                c_sg1, c_sg2 = st.columns(2)
+                with c_sg1:
+                    seg_n = st.number_input("Segments", 1, 4096, 20, key="seg_n")
+                    seg_adaptive = st.checkbox("Adaptive refinement", True, key="seg_adaptive",
+                                               help="Doubles the segment count until the pressure drop converges")
+                with c_sg2:
+                    seg_u = st.number_input("Heat Loss U (W/m²K)", 0.0, step=0.5, key="seg_u",
+                                            help="Overall coefficient on the outer surface; 0 = insulated")
+                    seg_amb = st.number_input("Ambient Temperature (°C)", value=20.0, key="seg_amb")
+            seg_on = seg_on and quality is None
             project_name = st.text_input("Project Name (Optional)", "New-Design-01")
 
             if st.button("🚀 CALCULATE", type="primary", use_container_width=True):
                 # Hesaplama
-                res = calculate_hydraulics(temp, flow, pressure, length, calculated_fitting_len, elevation, pump_eff, material_name, nps_selected, sch_selected)
-                
-                if res:
-                    st.session_state['res_dp'] = res
-                    conn = sqlite3.connect(DB_FILE)
-                    cur = conn.cursor()
-                    cur.execute("INSERT INTO projects (name, material, nps, sch, pressure_drop, velocity) VALUES (?,?,?,?,?,?)", 
-                                (project_name, material_name, nps_selected, sch_selected, res['dp_total'], res['vel']))
-                    conn.commit()
-                    conn.close()
-                    st.toast("Calculation saved!", icon="✅")
+                try:
+                    if seg_on:
+                        res = cached_march(temp, flow, pressure, length, calculated_fitting_len, elevation, pump_eff, material_name,
+                                           nps_selected, sch_selected, fluid, n_segments=seg_n, adaptive=seg_adaptive,
+                                           u_w_m2k=seg_u, ambient_c=seg_amb)
+                    else:
+                        res = cached_hydraulics(temp, flow, pressure, length, calculated_fitting_len, elevation, pump_eff, material_name,
+                                                nps_selected, sch_selected, fluid, quality, tp_model)
+                except PropertyError as e:
+                    st.error(f"Property Error: {e}")
                 else:
-                    st.error("Calculation Error! Check inputs.")
+                    if res:
+                        st.session_state['res_dp'] = res
+                        project_id = db.insert_project(project_name, material_name, nps_selected, sch_selected, res['dp_total'], res['vel'])
+                        # Et kalınlığı kontrolü aynı boru için bu satıra emniyet katsayısı yazar
+                        st.session_state['last_project'] = (project_id, project_name, nps_selected, sch_selected)
+                        st.toast("Calculation saved!", icon="✅")
+                    else:
+                        st.error("Calculation Error! Check inputs.")
 
     with col_result:
         if 'res_dp' in st.session_state:
             res = st.session_state['res_dp']
             st.header("2. Results")
+            if res.get('phase', 'liquid') not in ("liquid", "two-phase"):
+                st.warning(f"⚠️ Fluid is **{res['phase']}** at these conditions (flashed/vapour); "
+                           "the line is treated as incompressible.")
             
             # --- Ana Sonuçlar ---
             with st.container(border=True):
@@ -315,14 +387,8 @@ if page_selection == "🏠 Pressure Drop Calc":
             # --- Detaylı Analiz ---
             st.subheader("Pressure Drop Breakdown")
             
-            fig_pie = px.pie(
-                values=[max(0, res['dp_friction']), max(0, res['dp_static'])], 
-                names=["Friction Loss (Pipe+Fittings)", "Static Head (Elevation)"],
-                hole=0.4,
-                color_discrete_sequence=['#FF4B4B', '#00CC96']
-            )
-            fig_pie.update_layout(height=300, margin=dict(t=0, b=0, l=0, r=0))
-            st.plotly_chart(fig_pie, use_container_width=True)
+            with stage("chart", "pressure breakdown"):
+                show_figure(breakdown_figure(res['dp_friction'], res['dp_static']))
 
             with st.expander("🔎 Detailed Calculations"):
                 st.write(f"**Total Equivalent Length:** {res['total_len']:.2f} m")
@@ -330,7 +396,96 @@ if page_selection == "🏠 Pressure Drop Calc":
                 st.write(f"**Static Head:** {res['dp_static']:.4f} bar")
                 st.write(f"**Reynolds No:** {res['re']:.0f}")
                 st.write(f"**Fluid Density:** {res['rho']:.2f} kg/m³")
-                
+                st.write(f"**Phase:** {res.get('phase', 'liquid')}")
+
+            if 'profile' in res:
+                with st.container(border=True):
+                    st.subheader("📏 Line Profile")
+                    s1, s2, s3 = st.columns(3)
+                    s1.metric("Outlet Pressure", f"{res['outlet_press_bar']:.3f} bar")
+                    s2.metric("Outlet Temperature", f"{res['outlet_temp_c']:.2f} °C")
+                    s3.metric("Heat Loss", f"{res['heat_loss_kw']:.1f} kW")
+                    st.caption(f"{res['segments']} segments · {res['passes']} property passes"
+                               + ("" if res['converged'] else
+                                  " · ⚠️ refinement stopped at the segment limit before dP settled"
+                                  if res['dp_converged'] is False else " · ⚠️ profile not converged"))
+                    with stage("chart", "line profile"):
+                        show_figure(profile_figure(res['profile']))
+
+            # --- POMPA ÇALIŞMA NOKTASI ---
+            with st.expander("⚙️ Pump Operating Point"):
+                st.caption("System curve of the line above against pump curves (CSV: pump, flow_m3h, head_m, efficiency_pct).")
+                pump_file = st.file_uploader("Pump curve CSV", type="csv", key="pump_csv")
+                if pump_file is not None:
+                    pump_bytes = pump_file.getvalue()
+                else:
+                    with open(PUMP_CURVES_FILE, "rb") as f:
+                        pump_bytes = f.read()
+                    st.caption("Using the bundled example catalogue.")
+                try:
+                    pumps = get_pump_curves(pump_bytes)
+                except ValueError as e:
+                    st.error(f"Pump curve file: {e}")
+                    pumps = {}
+
+                if pumps and (fluid != "Water" or quality is not None):
+                    st.info("Pump matching uses the single-phase water system curve; select Water to use it.")
+                elif pumps:
+                    duty_m3h = flow * 1000 / res['rho']
+                    c_p1, c_p2, c_p3 = st.columns(3)
+                    with c_p1:
+                        pump_name = st.selectbox("Pump", list(pumps.keys()), key="pump_name")
+                    with c_p2:
+                        arrangement = st.selectbox("Arrangement", ["Single", "Parallel", "Series"], key="pump_arr")
+                        n_pumps = 1 if arrangement == "Single" else st.number_input("Pumps", 2, 6, 2, key="pump_n")
+                    with c_p3:
+                        speed = st.slider("VFD Speed (%)", 30, 120, 100, key="pump_speed") / 100
+                    parallel = n_pumps if arrangement == "Parallel" else 1
+                    series = n_pumps if arrangement == "Series" else 1
+                    pump = pumps[pump_name]
+
+                    q_top = max(pump.q_max * speed * parallel, 1.5 * duty_m3h)
+                    try:
+                        sys_df = cached_system_curve(q_top, temp, pressure, length, material_name, nps_selected, sch_selected,
+                                              fitting_len_m=calculated_fitting_len, elevation_m=elevation, points=201)
+                    except ValueError as e:
+                        sys_df = None
+                        st.warning(f"System curve unavailable: {e}")
+                    if sys_df is not None:
+                        op = operating_point(pump, sys_df, speed, parallel, series)
+
+                        with stage("chart", "pump curves"):
+                            fig_pump = go.Figure()
+                            fig_pump.add_trace(go.Scatter(x=sys_df["flow_m3h"], y=sys_df["head_m"], name="System"))
+                            fig_pump.add_trace(go.Scatter(x=sys_df["flow_m3h"], y=pump.head(sys_df["flow_m3h"], speed, parallel, series),
+                                                          name=pump_name))
+                            if op:
+                                fig_pump.add_trace(go.Scatter(x=[op["flow_m3h"]], y=[op["head_m"]], mode="markers",
+                                                              marker=dict(size=12, color="#FF4B4B"), name="Operating Point"))
+                            fig_pump.add_vline(x=duty_m3h, line_dash="dot", annotation_text="Duty")
+                            fig_pump.update_layout(height=350, xaxis_title="Flow (m³/h)", yaxis_title="Head (m)",
+                                                   margin=dict(t=20, b=0, l=0, r=0))
+                            st.plotly_chart(fig_pump, use_container_width=True)
+
+                        if op:
+                            o1, o2, o3 = st.columns(3)
+                            o1.metric("Flow", f"{op['flow_m3h']:.1f} m³/h")
+                            o2.metric("Head", f"{op['head_m']:.1f} m")
+                            o3.metric("Shaft Power", f"{op['power_shaft']:.1f} kW", help=f"Efficiency {op['efficiency_pct']:.1f} %")
+                        else:
+                            st.warning("Pump and system curves do not intersect.")
+
+                        if st.button("Select Pumps for Duty", use_container_width=True):
+                            ranked = select_pumps(pumps, sys_df, duty_flow_m3h=duty_m3h, parallel=parallel, series=series)
+                            if len(ranked):
+                                ranked["speed"] *= 100
+                                st.dataframe(ranked[["pump", "speed", "head_m", "efficiency_pct", "power_shaft"]].rename(columns={
+                                    "pump": "Pump", "speed": "VFD Speed (%)", "head_m": "Head (m)",
+                                    "efficiency_pct": "Efficiency (%)", "power_shaft": "Shaft Power (kW)"}),
+                                    hide_index=True, use_container_width=True)
+                            else:
+                                st.warning("No pump in the catalogue reaches the duty point.")
+
         else:
             st.info("👈 Please enter data and click Calculate.")
 
@@ -351,26 +506,22 @@ elif page_selection == "🛡️ Wall Thickness Check":
             
             c_s1, c_s2 = st.columns(2)
             with c_s1:
-                nps_safe = st.selectbox("Size (Inch)", list(pipe_database.keys()), index=6, key="safe_nps")
+                nps_safe = st.selectbox("Size (Inch)", NPS_SIZES, index=NPS_SIZES.index("4 inch"), key="safe_nps")
             with c_s2:
-                sch_safe = st.selectbox("Schedule", list(pipe_database[nps_safe].keys()), key="safe_sch")
+                sch_safe = st.selectbox("Schedule", SCHEDULES[nps_safe],
+                                        index=SCHEDULES[nps_safe].index(default_schedule(nps_safe)), key="safe_sch")
                 
             design_pres = st.number_input("Design Pressure (bar)", value=40.0)
             
             if st.button("🛡️ CHECK SAFETY", type="primary", use_container_width=True):
-                P_MPa = design_pres / 10.0
-                S_MPa = asme_material_data[mat_safe]
-                OD_mm = pipe_database[nps_safe][sch_safe]["OD"]
-                WT_actual = pipe_database[nps_safe][sch_safe]["WT"]
-                
-                t_req = (P_MPa * OD_mm) / (2 * (S_MPa * 1.0 + P_MPa * 0.4))
-                t_min = t_req + 1.0 
-                safety_factor = WT_actual / t_min
-                is_safe = safety_factor >= 1.0
-                
-                st.session_state['res_safe'] = {
-                    "req": t_min, "act": WT_actual, "safe": is_safe, "sf": safety_factor, "mat": mat_safe
-                }
+                res = check_wall_thickness(mat_safe, nps_safe, sch_safe, design_pres)
+                st.session_state['res_safe'] = res
+                last = st.session_state.get('last_project')
+                if last and last[2:] == (nps_safe, sch_safe) and db.set_safety_factor(last[0], res['sf']):
+                    st.toast(f"Safety factor saved to {last[1]}", icon="✅")
+                else:
+                    db.insert_project(f"Wall check {mat_safe}", None, nps_safe, sch_safe, None, None, res['sf'])
+                    st.toast("Wall check saved!", icon="✅")
 
     with col_safe2:
         if 'res_safe' in st.session_state:
@@ -385,9 +536,8 @@ elif page_selection == "🛡️ Wall Thickness Check":
             else:
                 st.error(f"⚠️ UNSAFE! Need > {res['req']:.2f} mm")
                 
-            fig_safe = go.Figure()
-            fig_safe.add_trace(go.Bar(x=["Required", "Actual"], y=[res['req'], res['act']], marker_color=['#FF4B4B', '#00CC96']))
-            st.plotly_chart(fig_safe, use_container_width=True)
+            with stage("chart", "wall thickness"):
+                show_figure(wall_figure(res['req'], res['act']))
 
 # ==================================================
 # SAYFA 3: ANALYTICS & SIMULATION
@@ -395,7 +545,7 @@ elif page_selection == "🛡️ Wall Thickness Check":
 elif page_selection == "📈 Analytics & Simulation":
     st.title("📈 Analytics & Simulation Hub")
     
-    tab_sim, tab_hist = st.tabs(["⚡ Live Simulation", "📊 Historical Charts"])
+    tab_sim, tab_sweep, tab_mc, tab_hist = st.tabs(["⚡ Live Simulation", "🗂️ Sweep Results", "🎲 Uncertainty", "📊 Historical Charts"])
     
     with tab_sim:
         st.subheader("Hydraulic Performance Simulator")
@@ -412,44 +562,136 @@ elif page_selection == "📈 Analytics & Simulation":
                 sim_len = st.number_input("Length (m)", 1000.0, key="sim_len")
                 btn_simulate = st.button("🔄 RUN SIMULATION", type="primary", use_container_width=True)
         
+        sim_inputs = (sim_temp, sim_flow, sim_pres, sim_len, sim_mat)
         if btn_simulate:
-            results_list = []
-            for size_name, schedules in pipe_database.items():
-                sch_to_use = "40" if "40" in schedules else list(schedules.keys())[0]
-                res = calculate_hydraulics(sim_temp, sim_flow, sim_pres, sim_len, 0, 0, 75, sim_mat, size_name, sch_to_use)
-                if res:
-                    results_list.append({
-                        "NPS": size_name, "ID (mm)": res['id_mm'],
-                        "Velocity (m/s)": res['vel'], "Pressure Drop (bar)": res['dp_total'],
-                        "Power (kW)": res['power_shaft']
-                    })
-            
-            df_sim = pd.DataFrame(results_list)
+            st.session_state['sim_inputs'] = sim_inputs
+
+        # Son çalıştırma oturumda kalır: sekme/widget değişiminde önbellekten yeniden çizilir
+        if 'sim_inputs' in st.session_state:
+            run_inputs = st.session_state['sim_inputs']
+            if run_inputs != sim_inputs:
+                st.caption("Showing the last run; press RUN SIMULATION to update for the inputs above.")
+            df_sim = simulation_table(*run_inputs)
             
             c_chart, c_tbl = st.columns([1.5, 1])
             with c_chart:
-                fig_sim = px.scatter(df_sim, x="Velocity (m/s)", y="Power (kW)",
-                                     color="NPS", size="ID (mm)", size_max=40,
-                                     text="NPS", title="Power Consumption vs Velocity")
-                fig_sim.update_traces(textposition='top center')
-                st.plotly_chart(fig_sim, use_container_width=True)
+                with stage("chart", "simulation"):
+                    show_figure(simulation_figure(*run_inputs))
             with c_tbl:
                 st.dataframe(df_sim.sort_values("Velocity (m/s)", ascending=False), hide_index=True, use_container_width=True)
 
+    with tab_sweep:
+        st.subheader("Sweep Result Explorer")
+        st.caption("Reads a sweep directory written by `python -m hydraulicsuite.sweep`; only the selected slice is loaded.")
+        sweep_dir = st.text_input("Sweep Directory", "sweep_results", key="sweep_dir")
+        spec_path = os.path.join(sweep_dir, "sweep.json")
+
+        if os.path.exists(spec_path):
+            with open(spec_path, encoding="utf-8") as f:
+                spec = json.load(f)
+            col_sw1, col_sw2, col_sw3 = st.columns(3)
+            with col_sw1:
+                sw_mat = st.selectbox("Material", spec["material"], key="sw_mat")
+            with col_sw2:
+                sw_temp = st.selectbox("Temp (°C)", spec["temp_c"], key="sw_temp")
+            with col_sw3:
+                sw_sch = st.selectbox("Schedule", sorted({s for _, s in spec["pipe"]}, key=lambda s: (not s.isdigit(), s.zfill(3))), key="sw_sch")
+
+            df_sw = read_results(
+                sweep_dir,
+                columns=["nps", "flow_th", "vel", "dp_total", "power_shaft"],
+                filters=[("material", "==", sw_mat), ("temp_c", "==", sw_temp), ("sch", "==", sw_sch), ("valid", "==", True)],
+            )
+            if not df_sw.empty:
+                with stage("chart", "sweep"):
+                    fig_sw = px.line(df_sw, x="flow_th", y="dp_total", color="nps",
+                                     labels={"flow_th": "Flow (t/h)", "dp_total": "Pressure Drop (bar)", "nps": "NPS"},
+                                     title=f"Pressure Drop vs Flow – Sch {sw_sch}")
+                    st.plotly_chart(fig_sw, use_container_width=True)
+                st.caption(f"{len(df_sw):,} rows loaded for this slice.")
+            else:
+                st.info("No finished results for this selection yet.")
+        else:
+            st.info("No sweep found in this directory.")
+
+    with tab_mc:
+        st.subheader("Monte Carlo Uncertainty")
+        st.caption("Samples uncertain inputs and runs every case through the vectorized engine; "
+                   "same seed and inputs give the same result.")
+        with st.container(border=True):
+            col_mc1, col_mc2, col_mc3 = st.columns(3)
+            with col_mc1:
+                mc_mat = st.selectbox("Material", list(material_list_roughness.keys()), key="mc_mat")
+                mc_nps = st.selectbox("Nominal Size", NPS_SIZES, index=NPS_SIZES.index("4 inch"), key="mc_nps")
+                mc_sch = st.selectbox("Schedule", SCHEDULES[mc_nps], index=SCHEDULES[mc_nps].index(default_schedule(mc_nps)), key="mc_sch")
+                mc_len = st.number_input("Length (m)", 1000.0, key="mc_len")
+            with col_mc2:
+                mc_flow = st.number_input("Flow (t/h)", 100.0, step=10.0, key="mc_flow")
+                mc_flow_sd = st.number_input("Flow Std. Dev. (%)", 0.0, 50.0, 5.0, key="mc_flow_sd")
+                mc_temp = st.number_input("Temp (°C)", 1.0, 300.0, 60.0, key="mc_temp")
+                mc_temp_band = st.number_input("Temp Range ± (°C)", 0.0, 100.0, 10.0, key="mc_temp_band")
+                mc_pres = st.number_input("Pressure (bar)", 1.0, 400.0, 10.0, key="mc_pres")
+            with col_mc3:
+                mc_rough = st.number_input("Aged Roughness (mm)", 0.0, 5.0, 0.5, key="mc_rough",
+                                           help="Roughness is sampled uniformly between the material value and this")
+                mc_fit_lo, mc_fit_hi = st.slider("Fitting Length Range (m)", 0.0, 500.0, (20.0, 120.0), key="mc_fit")
+                mc_n = st.select_slider("Cases", [10_000, 100_000, 1_000_000], 100_000, key="mc_n")
+                mc_seed = st.number_input("Seed", 0, value=0, key="mc_seed")
+                mc_workers = st.number_input("Processes", 1, os.cpu_count() or 1, 1, key="mc_workers")
+            btn_mc = st.button("🎲 RUN UNCERTAINTY", type="primary", use_container_width=True)
+
+        if btn_mc:
+            rough0 = material_list_roughness[mc_mat]
+            mc_spec = make_uncertainty_spec(
+                dict(temp_c=mc_temp, flow_th=mc_flow, press_bar=mc_pres, length_m=mc_len, fitting_len_m=mc_fit_lo,
+                     elevation_m=0, pump_eff=75, material=mc_mat, nps=mc_nps, sch=mc_sch),
+                {"flow_th": ("normal", mc_flow, mc_flow * mc_flow_sd / 100),
+                 "temp_c": ("uniform", mc_temp - mc_temp_band, mc_temp + mc_temp_band),
+                 "roughness_mm": ("uniform", min(rough0, mc_rough), max(rough0, mc_rough)),
+                 "fitting_len_m": ("uniform", mc_fit_lo, mc_fit_hi)},
+                n=mc_n, seed=mc_seed)
+            bar = st.progress(0.0, text="Sampling...")
+            try:
+                st.session_state['res_mc'] = run_uncertainty(mc_spec, max_workers=mc_workers,
+                                                             progress=lambda d, t: bar.progress(d / t, text=f"Chunk {d}/{t}"))
+                st.session_state['res_mc_key'] = json.dumps(mc_spec, sort_keys=True)
+            except ValueError as e:
+                st.session_state.pop('res_mc', None)
+                st.error(f"Uncertainty Error: {e}")
+            bar.empty()
+
+        if 'res_mc' in st.session_state:
+            r = st.session_state['res_mc']
+            pct = r["percentiles"]
+            u1, u2, u3, u4 = st.columns(4)
+            u1.metric("dP P50", f"{pct.loc['dp_total', 'p50']:.3f} bar")
+            u2.metric("dP P90", f"{pct.loc['dp_total', 'p90']:.3f} bar")
+            u3.metric("Power P90", f"{pct.loc['power_shaft', 'p90']:.1f} kW")
+            u4.metric("Valid Cases", f"{r['n_valid']:,} / {r['n']:,}")
+
+            with stage("chart", "uncertainty"):
+                fig_mc, fig_tor = uncertainty_figures(st.session_state['res_mc_key'], r)
+                c_mc1, c_mc2 = st.columns(2)
+                with c_mc1:
+                    show_figure(fig_mc)
+                with c_mc2:
+                    show_figure(fig_tor)
+            st.dataframe(pct, use_container_width=True)
+            st.dataframe(r["tornado"], hide_index=True, use_container_width=True)
+
     with tab_hist:
-        conn = sqlite3.connect(DB_FILE)
-        df_hist = pd.read_sql("SELECT * FROM projects", conn)
-        conn.close()
+        # SQL'de toplanır; yeni kayıt (last_id değişimi) önbelleği geçersiz kılar
+        df_mat, df_vel = history_aggregates(db.last_id())
         
-        if not df_hist.empty:
+        if not df_mat.empty:
             st.subheader("Historical Data Analysis")
-            col_h1, col_h2 = st.columns(2)
-            with col_h1:
-                fig_pie = px.pie(df_hist, names='material', hole=0.4, title="Material Usage")
-                st.plotly_chart(fig_pie, use_container_width=True)
-            with col_h2:
-                fig_hist = px.histogram(df_hist, x="velocity", nbins=10, title="Velocity Distribution")
-                st.plotly_chart(fig_hist, use_container_width=True)
+            with stage("chart", "history"):
+                fig_pie, fig_hist = history_figures(db.last_id())
+                col_h1, col_h2 = st.columns(2)
+                with col_h1:
+                    show_figure(fig_pie)
+                with col_h2:
+                    show_figure(fig_hist)
         else:
             st.info("No historical data available yet.")
 
@@ -459,27 +701,158 @@ elif page_selection == "📈 Analytics & Simulation":
 elif page_selection == "📚 Project History":
     st.title("📚 Project History")
     
-    conn = sqlite3.connect(DB_FILE)
-    df = pd.read_sql("SELECT * FROM projects ORDER BY id DESC", conn)
-    conn.close()
-    
-    if not df.empty:
-        search_term = st.text_input("🔍 Search", "")
-        if search_term:
-            df = df[df['name'].str.contains(search_term, case=False) | df['material'].str.contains(search_term, case=False)]
-        
-        st.dataframe(
-            df, 
-            use_container_width=True, 
-            hide_index=True,
-            column_config={
-                "timestamp": st.column_config.DatetimeColumn("Date", format="D MMM YYYY, HH:mm"),
-                "pressure_drop": st.column_config.NumberColumn("Total dP (bar)", format="%.4f"),
-                "velocity": st.column_config.NumberColumn("Vel (m/s)", format="%.2f"),
-            }
-        )
+    HISTORY_PAGE_SIZE = 50
+
+    if db.last_id() > 0:
+        search_term = st.text_input("🔍 Search", "", help="Matches word prefixes in name, material and size")
+
+        # Sayfa imleçleri: her sayfanın başladığı "id <" sınırı
+        if st.session_state.get('hist_term') != search_term:
+            st.session_state['hist_term'] = search_term
+            st.session_state['hist_cursors'] = [None]
+        cursors = st.session_state['hist_cursors']
+
+        total = count_projects(search_term, db.last_id())
+        df = db.page_projects(search_term, before_id=cursors[-1], limit=HISTORY_PAGE_SIZE)
+
+        with stage("table", "history page"):
+            st.dataframe(
+                df, 
+                use_container_width=True, 
+                hide_index=True,
+                column_config={
+                    "timestamp": st.column_config.DatetimeColumn("Date", format="D MMM YYYY, HH:mm"),
+                    "pressure_drop": st.column_config.NumberColumn("Total dP (bar)", format="%.4f"),
+                    "velocity": st.column_config.NumberColumn("Vel (m/s)", format="%.2f"),
+                }
+            )
+
+        n_pages = max(1, -(-total // HISTORY_PAGE_SIZE))
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("◀ Newer", disabled=len(cursors) == 1, use_container_width=True):
+                cursors.pop()
+                st.rerun()
+        with col_page:
+            st.caption(f"Page {len(cursors)} of {n_pages} · {total:,} records")
+        with col_next:
+            if st.button("Older ▶", disabled=len(cursors) >= n_pages, use_container_width=True):
+                cursors.append(int(df['id'].iloc[-1]))
+                st.rerun()
         
-        csv = df.to_csv(index=False).encode('utf-8')
-        st.download_button("📥 Download CSV", csv, "projects_export.csv", "text/csv", type="primary")
+        col_dl1, col_dl2 = st.columns(2)
+        with col_dl1:
+            st.download_button("📥 Download CSV", lambda: spool_csv(db.iter_search(search_term)),
+                               "projects_export.csv", "text/csv", type="primary")
+        with col_dl2:
+            st.download_button("📥 Download Parquet", lambda: spool_parquet(db.iter_search(search_term)),
+                               "projects_export.parquet", "application/vnd.apache.parquet")
     else:
         st.warning("Database is empty.")
+
+# ==================================================
+# SAYFA 5: WATER HAMMER (MOC TRANSIENT)
+# ==================================================
+elif page_selection == "🌊 Water Hammer":
+    st.title("🌊 Water Hammer (Transient)")
+
+    col_wh1, col_wh2 = st.columns([1, 1.4])
+
+    with col_wh1:
+        with st.container(border=True):
+            st.subheader("Line")
+            wh_mat = st.selectbox("Material (Roughness)", list(material_list_roughness.keys()), key="wh_mat")
+            wh_asme = st.selectbox("ASME Material Spec", [k for k, v in asme_material_data.items() if v > 0], index=1, key="wh_asme")
+            c_w1, c_w2 = st.columns(2)
+            with c_w1:
+                wh_nps = st.selectbox("Size (Inch)", NPS_SIZES, index=NPS_SIZES.index("4 inch"), key="wh_nps")
+                wh_flow = st.number_input("Mass Flow (t/h)", 100.0, step=10.0, key="wh_flow")
+                wh_pres = st.number_input("Upstream Pressure (bar)", 10.0, key="wh_pres")
+                wh_len = st.number_input("Length (m)", 1000.0, step=100.0, key="wh_len")
+            with c_w2:
+                wh_sch = st.selectbox("Schedule", SCHEDULES[wh_nps],
+                                      index=SCHEDULES[wh_nps].index(default_schedule(wh_nps)), key="wh_sch")
+                wh_temp = st.number_input("Temperature (°C)", 20.0, key="wh_temp")
+                wh_elev = st.number_input("Elevation Change (m)", 0.0, key="wh_elev")
+                wh_nodes = st.number_input("Reaches (grid)", 50, 20000, 500, step=50, key="wh_nodes")
+
+            st.subheader("Event")
+            wh_scenario = st.selectbox("Scenario", SCENARIOS, format_func=lambda s: s.replace("_", " ").title(), key="wh_scn")
+            c_w3, c_w4 = st.columns(2)
+            with c_w3:
+                wh_tc = st.number_input("Closure / Run-down Time (s)", 0.0, value=2.0, step=0.5, key="wh_tc")
+            with c_w4:
+                wh_exp = st.number_input("Closure Exponent", 0.2, 5.0, 1.0, step=0.1, key="wh_exp",
+                                         disabled=wh_scenario != "valve_closure")
+
+            if st.button("🌊 RUN TRANSIENT", type="primary", use_container_width=True):
+                bar = st.progress(0.0)
+                try:
+                    st.session_state['res_wh'] = simulate_transient(
+                        wh_flow, wh_temp, wh_pres, wh_len, wh_mat, wh_nps, wh_sch, wh_asme,
+                        scenario=wh_scenario, t_close=wh_tc, closure_exponent=wh_exp, elevation_m=wh_elev,
+                        n_reaches=wh_nodes, progress=lambda n, total: bar.progress(n / total))
+                    st.session_state['res_wh_asme'] = (wh_asme, wh_nps, wh_sch)
+                    st.session_state['res_wh_key'] = json.dumps([wh_flow, wh_temp, wh_pres, wh_len, wh_mat, wh_nps, wh_sch, wh_asme,
+                                                                 wh_scenario, wh_tc, wh_exp, wh_elev, wh_nodes])
+                except ValueError as e:
+                    st.error(f"Transient Error: {e}")
+                bar.empty()
+
+    with col_wh2:
+        if 'res_wh' in st.session_state:
+            r = st.session_state['res_wh']
+            k1, k2, k3, k4 = st.columns(4)
+            k1.metric("Wave Speed", f"{r['wave_speed']:.0f} m/s")
+            k2.metric("Joukowsky ΔP", f"{r['joukowsky_bar']:.1f} bar")
+            k3.metric("Max Pressure", f"{r['max_pressure_bar']:.1f} bar")
+            k4.metric("Min Pressure", f"{r['min_pressure_bar']:.1f} bar")
+            if r['cavitation']:
+                st.warning("⚠️ Pressure falls to vapour pressure: column separation likely (not modelled).")
+
+            # Dalga basıncı, Wall Thickness sayfasındaki B31.3 kontrolüne karşı
+            surge_check = check_wall_thickness(*st.session_state['res_wh_asme'], r['max_pressure_bar'])
+            if surge_check:
+                if surge_check['safe']:
+                    st.success(f"✅ Wall OK for surge pressure · Factor {surge_check['sf']:.2f}")
+                else:
+                    st.error(f"⚠️ Wall too thin for surge pressure: need {surge_check['req']:.2f} mm")
+
+            with stage("chart", "surge"):
+                fig_t, fig_e = surge_figures(st.session_state['res_wh_key'], r)
+                show_figure(fig_t)
+                show_figure(fig_e)
+            st.caption(f"{r['steps']:,} time steps · dt = {r['dt'] * 1000:.2f} ms")
+        else:
+            st.info("👈 Define the line and event, then run the transient.")
+
+# ==================================================
+# TANILAMA PANELİ (bu çalıştırmanın süreleri)
+# ==================================================
+if profiler:
+    st.session_state.pop("diag_profiler", None)
+    st.session_state["diag_profile_result"] = profiler.stop()
+    st.session_state["diag_profile"] = False  # tek seferlik yakalama
+diag = rerun.finish()
+
+def arm_profiler():
+    st.session_state["diag_armed_at"] = st.session_state["diag_run"]
+
+with st.sidebar:
+    with st.expander("🩺 Diagnostics"):
+        st.caption(f"Last rerun: **{diag['total_ms']:.0f} ms** · session {diag['session']}")
+        st.bar_chart(pd.Series(diag["by_category"], name="ms"), horizontal=True, height=180)
+        if diag["stages"]:
+            st.dataframe(pd.DataFrame(diag["stages"]).round(2), hide_index=True, use_container_width=True)
+        c_dg1, c_dg2 = st.columns(2)
+        with c_dg1:
+            st.toggle("Profile next rerun", key="diag_profile", on_change=arm_profiler,
+                      help="Captures the next rerun (e.g. the next CALCULATE) once")
+        with c_dg2:
+            st.selectbox("Profiler", available_profilers(), key="diag_engine", label_visibility="collapsed")
+        prof = st.session_state.get("diag_profile_result")
+        if prof and "error" in prof:
+            st.warning(f"Profiler unavailable: {prof['error']}")
+        elif prof:
+            st.code(prof["text"][:20000], language=None)
+            st.download_button(f"📥 {prof['file_name']}", prof["data"], prof["file_name"], key="diag_download")